@@ -6,128 +6,125 @@ import importlib
 
 from zpace.core import (
     calculate_dir_size,
+    can_track_path,
     categorize_extension,
     identify_special_dir_name,
     push_top_n,
+    scan_dir_batch,
+    scan_dir_entries,
     scan_files_and_dirs,
+    size_dir_tree,
     is_skip_path,
 )
-from zpace.utils import format_size
-from zpace.main import print_results, main
+from zpace.utils import format_size, get_cached_trash_size
+from zpace.main import print_results, main, run_in_background
 from zpace.config import (
+    DIR_CATEGORY_NAMES,
+    FILE_CATEGORY_NAMES,
     MIN_FILE_SIZE,
     SKIP_DIRS,
+    SKIP_NAMES_BY_LEVEL,
 )
 from io import StringIO
 import os
 
+# Shared contents for fake files of exactly the minimum reported size
+_MIN = bytes(MIN_FILE_SIZE)
+
+
+@pytest.fixture(autouse=True)
+def trash_cache_file(tmp_path, monkeypatch):
+    """Keep the Trash size cache out of the real home directory."""
+    cache_file = tmp_path / "cache" / "trash.json"
+    monkeypatch.setattr("zpace.utils.TRASH_CACHE_FILE", cache_file)
+    return cache_file
+
+
+def _names(cats):
+    """File names of every entry in a scan result's category dict."""
+    return [path.rpartition(os.sep)[2] for entries in cats.values() for _, path in entries]
+
 
 class TestCategorizeExtension:
     """Test file categorization."""
 
-    def test_picture_extensions(self):
-        assert categorize_extension(".jpg") == "Pictures"
-        assert categorize_extension(".PNG") == "Pictures"
-        assert categorize_extension(".svg") == "Pictures"
-        assert categorize_extension(".heic") == "Pictures"
-
-    def test_document_extensions(self):
-        assert categorize_extension(".pdf") == "Documents"
-        assert categorize_extension(".xlsx") == "Documents"
-        assert categorize_extension(".txt") == "Documents"
-        assert categorize_extension(".pptx") == "Documents"
-
-    def test_code_extensions(self):
-        assert categorize_extension(".py") == "Code"
-        assert categorize_extension(".js") == "Code"
-        assert categorize_extension(".rs") == "Code"
-        assert categorize_extension(".tsx") == "Code"
-
-    def test_video_extensions(self):
-        assert categorize_extension(".mp4") == "Videos"
-        assert categorize_extension(".mkv") == "Videos"
-        assert categorize_extension(".webm") == "Videos"
-
-    def test_music_extensions(self):
-        assert categorize_extension(".mp3") == "Music"
-        assert categorize_extension(".flac") == "Music"
-        assert categorize_extension(".m4a") == "Music"
-
-    def test_archive_extensions(self):
-        assert categorize_extension(".zip") == "Archives"
-        assert categorize_extension(".gz") == "Archives"
-        assert categorize_extension(".7z") == "Archives"
-
-    def test_config_extensions(self):
-        assert categorize_extension(".yml") == "Config"
-        assert categorize_extension(".json") == "Config"
-
-    def test_unknown_extension(self):
-        assert categorize_extension(".xyz") == "Others"
-        assert categorize_extension("") == "Others"
-        assert categorize_extension(".") == "Others"
+    def test_categorize_table(self):
+        expected = {
+            ".jpg": "Pictures",
+            ".PNG": "Pictures",
+            ".svg": "Pictures",
+            ".heic": "Pictures",
+            ".pdf": "Documents",
+            ".xlsx": "Documents",
+            ".txt": "Documents",
+            ".pptx": "Documents",
+            ".py": "Code",
+            ".js": "Code",
+            ".rs": "Code",
+            ".tsx": "Code",
+            ".mp4": "Videos",
+            ".mkv": "Videos",
+            ".webm": "Videos",
+            ".mp3": "Music",
+            ".flac": "Music",
+            ".m4a": "Music",
+            ".zip": "Archives",
+            ".gz": "Archives",
+            ".7z": "Archives",
+            ".yml": "Config",
+            ".json": "Config",
+            ".xyz": "Others",
+            "": "Others",
+            ".": "Others",
+        }
+        assert {ext: categorize_extension(ext) for ext in expected} == expected
 
 
 class TestIdentifySpecialDirName:
     """Test special directory identification."""
 
-    def test_virtual_environments(self):
-        assert identify_special_dir_name(".venv") == "Virtual Environments"
-        assert identify_special_dir_name("venv") == "Virtual Environments"
-        assert identify_special_dir_name("env") == "Virtual Environments"
-        assert identify_special_dir_name("conda") == "Virtual Environments"
-        assert identify_special_dir_name(".conda") == "Virtual Environments"
-        assert identify_special_dir_name("miniconda3") == "Virtual Environments"
-        assert identify_special_dir_name("anaconda3") == "Virtual Environments"
-
-    def test_node_modules(self):
-        assert identify_special_dir_name("node_modules") == "Node Modules"
-
-    def test_git_repos(self):
-        assert identify_special_dir_name(".git") == "Git Repos"
-
-    def test_build_artifacts(self):
-        assert identify_special_dir_name("target") == "Build Artifacts"
-        assert identify_special_dir_name("build") == "Build Artifacts"
-        assert identify_special_dir_name("dist") == "Build Artifacts"
-        assert identify_special_dir_name(".next") == "Build Artifacts"
-        assert identify_special_dir_name(".nuxt") == "Build Artifacts"
-        assert identify_special_dir_name(".svelte-kit") == "Build Artifacts"
-        assert identify_special_dir_name(".bazel") == "Build Artifacts"
-        assert identify_special_dir_name("bazel-bin") == "Build Artifacts"
-        assert identify_special_dir_name("bazel-out") == "Build Artifacts"
-
-    def test_macos_apps(self):
-        assert identify_special_dir_name("Safari.app") == "macOS Apps"
-        assert identify_special_dir_name("MyApp.app") == "macOS Apps"
-
-    def test_package_caches(self):
-        assert identify_special_dir_name(".npm") == "Package Caches"
-        assert identify_special_dir_name(".m2") == "Package Caches"
-        assert identify_special_dir_name("__pycache__") == "Package Caches"
-        assert identify_special_dir_name(".bun") == "Package Caches"
-        assert identify_special_dir_name(".deno") == "Package Caches"
-        assert identify_special_dir_name(".pnpm") == "Package Caches"
-        assert identify_special_dir_name(".uv") == "Package Caches"
-
-    def test_ide_config(self):
-        assert identify_special_dir_name(".idea") == "IDE Config"
-        assert identify_special_dir_name(".vscode") == "IDE Config"
-        assert identify_special_dir_name(".fleet") == "IDE Config"
-
-    def test_temp_files(self):
-        assert identify_special_dir_name("tmp") == "Temp Files"
-        assert identify_special_dir_name("temp") == "Temp Files"
-        assert identify_special_dir_name(".tmp") == "Temp Files"
-
-    def test_ml_artifacts(self):
-        assert identify_special_dir_name("weights") == "ML Artifacts"
-        assert identify_special_dir_name("checkpoints") == "ML Artifacts"
-        assert identify_special_dir_name("pretrained") == "ML Artifacts"
-
-    def test_normal_directory(self):
-        assert identify_special_dir_name("directory") is None
-        assert identify_special_dir_name("documents") is None
+    def test_identify_table(self):
+        expected = {
+            ".venv": "Virtual Environments",
+            "venv": "Virtual Environments",
+            "env": "Virtual Environments",
+            "conda": "Virtual Environments",
+            ".conda": "Virtual Environments",
+            "miniconda3": "Virtual Environments",
+            "anaconda3": "Virtual Environments",
+            "node_modules": "Node Modules",
+            ".git": "Git Repos",
+            "target": "Build Artifacts",
+            "build": "Build Artifacts",
+            "dist": "Build Artifacts",
+            ".next": "Build Artifacts",
+            ".nuxt": "Build Artifacts",
+            ".svelte-kit": "Build Artifacts",
+            ".bazel": "Build Artifacts",
+            "bazel-bin": "Build Artifacts",
+            "bazel-out": "Build Artifacts",
+            "Safari.app": "macOS Apps",
+            "MyApp.app": "macOS Apps",
+            ".npm": "Package Caches",
+            ".m2": "Package Caches",
+            "__pycache__": "Package Caches",
+            ".bun": "Package Caches",
+            ".deno": "Package Caches",
+            ".pnpm": "Package Caches",
+            ".uv": "Package Caches",
+            ".idea": "IDE Config",
+            ".vscode": "IDE Config",
+            ".fleet": "IDE Config",
+            "tmp": "Temp Files",
+            "temp": "Temp Files",
+            ".tmp": "Temp Files",
+            "weights": "ML Artifacts",
+            "checkpoints": "ML Artifacts",
+            "pretrained": "ML Artifacts",
+            "directory": None,
+            "documents": None,
+        }
+        assert {name: identify_special_dir_name(name) for name in expected} == expected
 
 
 class TestShouldSkipPath:
@@ -148,29 +145,34 @@ class TestShouldSkipPath:
         assert not is_skip_path("/Users")
         assert not is_skip_path("/tmp")
 
+    @pytest.mark.skipif(sys.platform == "win32", reason="Skip dirs are POSIX paths")
+    def test_skip_names_indexed_by_parent_level(self):
+        assert {"dev", "proc", "System"} <= SKIP_NAMES_BY_LEVEL[1]
+        assert SKIP_NAMES_BY_LEVEL[2] == {"run", "var"}
+        assert 3 not in SKIP_NAMES_BY_LEVEL
+
 
 class TestFormatSize:
     """Test size formatting."""
 
-    def test_bytes(self):
-        assert format_size(0) == "0.00 B"
-        assert format_size(500) == "500.00 B"
-        assert format_size(1023) == "1023.00 B"
-
-    def test_kilobytes(self):
-        assert format_size(1024) == "1.00 KB"
-        assert format_size(1536) == "1.50 KB"
-
-    def test_megabytes(self):
-        assert format_size(1024 * 1024) == "1.00 MB"
-        assert format_size(1024 * 1024 * 5) == "5.00 MB"
-
-    def test_gigabytes(self):
-        assert format_size(1024 * 1024 * 1024) == "1.00 GB"
-        assert format_size(1024 * 1024 * 1024 * 2.5) == "2.50 GB"
-
-    def test_terabytes(self):
-        assert format_size(1024 * 1024 * 1024 * 1024) == "1.00 TB"
+    def test_format_table(self):
+        expected = {
+            0: "0.00 B",
+            500: "500.00 B",
+            1023: "1023.00 B",
+            1024: "1.00 KB",
+            1536: "1.50 KB",
+            1024 * 1024: "1.00 MB",
+            1024 * 1024 * 5: "5.00 MB",
+            1024 * 1024 * 1024: "1.00 GB",
+            1024 * 1024 * 1024 * 2.5: "2.50 GB",
+            1024 * 1024 * 1024 * 1024: "1.00 TB",
+            1023.5: "1023.50 B",
+            1024**4 - 1: "1024.00 GB",
+            1024**5: "1.00 PB",
+            1024**6: "1024.00 PB",
+        }
+        assert {size: format_size(size) for size in expected} == expected
 
 
 class TestCalculateDirSize:
@@ -183,8 +185,8 @@ class TestCalculateDirSize:
 
     def test_directory_with_files(self, fs):
         fs.create_dir("/test")
-        fs.create_file("/test/file1.txt", contents="a" * 1000)
-        fs.create_file("/test/file2.txt", contents="b" * 2000)
+        fs.create_file("/test/file1.txt", contents=bytes(1000))
+        fs.create_file("/test/file2.txt", contents=bytes(2000))
 
         size = calculate_dir_size("/test")
         # Should be at least the content size
@@ -193,16 +195,36 @@ class TestCalculateDirSize:
     def test_nested_directories(self, fs):
         fs.create_dir("/test")
         fs.create_dir("/test/subdir")
-        fs.create_file("/test/root.txt", contents="root" * 100)
-        fs.create_file("/test/subdir/nested.txt", contents="nested" * 100)
+        fs.create_file("/test/root.txt", contents=bytes(400))
+        fs.create_file("/test/subdir/nested.txt", contents=bytes(600))
 
         size = calculate_dir_size("/test")
         assert size >= 1000
 
+    def test_nested_directories_on_real_filesystem(self, tmp_path):
+        (tmp_path / "a" / "b").mkdir(parents=True)
+        (tmp_path / "top.bin").write_bytes(bytes(5000))
+        (tmp_path / "a" / "b" / "deep.bin").write_bytes(bytes(7000))
+
+        size = calculate_dir_size(str(tmp_path))
+        assert size >= 12000
+
     def test_nonexistent_directory(self):
         size = calculate_dir_size("/nonexistent/directory/path")
         assert size == 0
 
+    def test_size_dir_tree_stops_after_max_dirs(self, fs):
+        fs.create_file("/test/a/one.bin", contents=bytes(1000))
+        fs.create_file("/test/b/two.bin", contents=bytes(2000))
+
+        partial, unvisited = size_dir_tree(["/test"], max_dirs=1)
+        assert partial == 0
+        assert sorted(unvisited) == [os.path.join("/test", "a"), os.path.join("/test", "b")]
+
+        rest, unvisited = size_dir_tree(unvisited)
+        assert unvisited == []
+        assert rest == calculate_dir_size("/test")
+
     def test_directory_with_permission_error(self, fs, monkeypatch):
         fs.create_dir("/noaccess")
 
@@ -215,6 +237,37 @@ class TestCalculateDirSize:
         assert size == 0
 
 
+class TestCachedTrashSize:
+    """Test the Trash size cache kept between runs."""
+
+    @pytest.fixture
+    def trash(self, tmp_path):
+        trash = tmp_path / "Trash"
+        (trash / "files").mkdir(parents=True)
+        (trash / "files" / "old.bin").write_bytes(bytes(5000))
+        return trash
+
+    def test_reuses_size_while_trash_is_unchanged(self, trash, monkeypatch):
+        size = get_cached_trash_size(str(trash))
+        assert size == calculate_dir_size(str(trash))
+
+        monkeypatch.setattr("zpace.utils.calculate_dir_size", lambda path: pytest.fail())
+        assert get_cached_trash_size(str(trash)) == size
+
+    def test_remeasures_after_trashing_more(self, trash):
+        before = get_cached_trash_size(str(trash))
+        (trash / "files" / "new.bin").write_bytes(bytes(50000))
+        os.utime(trash / "files", ns=(0, 0))  # Guarantee a different mtime on coarse clocks
+
+        assert get_cached_trash_size(str(trash)) > before
+
+    def test_ignores_unreadable_cache(self, trash, trash_cache_file):
+        trash_cache_file.parent.mkdir()
+        trash_cache_file.write_text("not json")
+
+        assert get_cached_trash_size(str(trash)) == calculate_dir_size(str(trash))
+
+
 class TestPushTopN:
     """Test the min-heap top-N helper function."""
 
@@ -250,6 +303,13 @@ class TestPushTopN:
         sorted_heap = sorted(heap, reverse=True)
         assert [s for s, _ in sorted_heap] == [500, 400, 300]
 
+    def test_heap_full_breaks_size_ties_by_path(self):
+        heap = []
+        push_top_n(heap, (100, "/b.txt"), 1)
+        push_top_n(heap, (100, "/a.txt"), 1)
+        push_top_n(heap, (100, "/c.txt"), 1)
+        assert heap == [(100, "/c.txt")]
+
     def test_heap_size_one(self):
         heap = []
         push_top_n(heap, (100, "/a.txt"), 1)
@@ -259,17 +319,78 @@ class TestPushTopN:
         assert heap[0] == (200, "/b.txt")
 
 
+# Files shared by the scan tests, relative to the scan_tree root: path -> size in bytes
+SCAN_TREE_FILES = {
+    "complex/node_modules/node.js": MIN_FILE_SIZE + 50000,
+    "complex/venv/python.py": MIN_FILE_SIZE + 50000,
+    "complex/image.jpg": MIN_FILE_SIZE + 50000,
+    "complex/script.py": MIN_FILE_SIZE + 10000,
+    "complex/large_file.dat": MIN_FILE_SIZE * 2,
+    "complex/documents/report.pdf": MIN_FILE_SIZE + 20000,
+    "complex/documents/data.xlsx": MIN_FILE_SIZE + 15000,
+    "complex/documents/small.txt": 1,
+    "complex/documents/subdocs/notes.doc": MIN_FILE_SIZE + 5000,
+    "complex/code/main.js": MIN_FILE_SIZE + 8000,
+    "complex/code/config.yml": MIN_FILE_SIZE + 3000,
+    "complex/code/src/utils.py": MIN_FILE_SIZE + 7000,
+    "complex/dev/device.file": MIN_FILE_SIZE + 10000,
+    "mixed/huge_video.mp4": MIN_FILE_SIZE * 10,
+    "mixed/small_image.jpg": MIN_FILE_SIZE // 2,  # Below threshold
+    "mixed/medium_doc.pdf": MIN_FILE_SIZE + 5000,
+    "mixed/config.json": MIN_FILE_SIZE + 2000,
+    "mixed/tiny_script.py": MIN_FILE_SIZE // 3,  # Below threshold
+    "mixed/large_archive.zip": MIN_FILE_SIZE * 5,
+    "top_docs/doc1.pdf": MIN_FILE_SIZE + 1000,
+    "top_docs/doc2.pdf": MIN_FILE_SIZE + 5000,
+    "top_docs/doc3.pdf": MIN_FILE_SIZE + 3000,
+    "top_docs/doc4.pdf": MIN_FILE_SIZE + 4000,
+    "top_docs/doc5.pdf": MIN_FILE_SIZE + 2000,
+    "top_multi/doc1.pdf": MIN_FILE_SIZE + 1000,
+    "top_multi/doc2.pdf": MIN_FILE_SIZE + 2000,
+    "top_multi/img1.jpg": MIN_FILE_SIZE + 3000,
+    "top_multi/img2.jpg": MIN_FILE_SIZE + 4000,
+    "top_multi/img3.jpg": MIN_FILE_SIZE + 5000,
+    "top_dirs/project0/node_modules/lib.js": MIN_FILE_SIZE + 1000,
+    "top_dirs/project1/node_modules/lib.js": MIN_FILE_SIZE + 9000,
+    "top_dirs/project2/node_modules/lib.js": MIN_FILE_SIZE + 5000,
+    "top_dirs/project3/node_modules/lib.js": MIN_FILE_SIZE + 3000,
+    "unicode/café.txt": MIN_FILE_SIZE,
+    "unicode/🚀.png": MIN_FILE_SIZE,
+    "unicode/こんにちは.doc": MIN_FILE_SIZE,
+}
+DEEP_TREE_LEVELS = 5
+# One file per level: deep/level1/file_at_level1.txt, deep/level1/level2/file_at_level2.txt, ...
+SCAN_TREE_FILES.update(
+    {
+        "/".join(
+            ["deep", *(f"level{i}" for i in range(1, depth + 1)), f"file_at_level{depth}.txt"]
+        ): MIN_FILE_SIZE
+        for depth in range(1, DEEP_TREE_LEVELS + 1)
+    }
+)
+
+
+@pytest.fixture(scope="session")
+def scan_tree(tmp_path_factory):
+    """Real directory tree shared by the scan tests, written once per session.
+
+    Files hold real bytes rather than being sparse, as sizes come from allocated blocks.
+    """
+    root = tmp_path_factory.mktemp("zpace")
+    for relpath, size in SCAN_TREE_FILES.items():
+        path = root / relpath
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * size)
+    return root
+
+
 class TestScanFilesAndDirs:
     """Test the main scanning functionality."""
 
-    @patch("zpace.core.tqdm")
-    def test_scan_empty_directory(self, mock_tqdm, fs):
-        mock_pbar = MagicMock()
-        mock_tqdm.return_value.__enter__.return_value = mock_pbar
-
+    def test_scan_empty_directory(self, fs):
         fs.create_dir("/empty")
         file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
-            Path("/empty"), used_bytes=100000, min_size=MIN_FILE_SIZE
+            Path("/empty"), min_size=MIN_FILE_SIZE
         )
 
         assert file_count == 0
@@ -277,18 +398,14 @@ class TestScanFilesAndDirs:
         assert file_cats == {}
         assert dir_cats == {}
 
-    @patch("zpace.core.tqdm")
-    def test_scan_with_files_below_min_size(self, mock_tqdm, fs):
-        mock_pbar = MagicMock()
-        mock_tqdm.return_value.__enter__.return_value = mock_pbar
-
-        fs.create_file("/test/small.txt", contents="x" * 1024)  # 1KB
-        fs.create_file("/test/tiny1.txt", contents="x")
-        fs.create_file("/test/tiny2.jpg", contents="x")
-        fs.create_file("/test/tiny3.py", contents="x")
+    def test_scan_with_files_below_min_size(self, fs):
+        fs.create_file("/test/small.txt", contents=bytes(1024))  # 1KB
+        fs.create_file("/test/tiny1.txt", contents=bytes(1))
+        fs.create_file("/test/tiny2.jpg", contents=bytes(1))
+        fs.create_file("/test/tiny3.py", contents=bytes(1))
 
         file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
-            Path("/test"), used_bytes=100000, min_size=MIN_FILE_SIZE
+            Path("/test"), min_size=MIN_FILE_SIZE
         )
 
         assert file_count == 4  # File is counted
@@ -297,17 +414,13 @@ class TestScanFilesAndDirs:
         assert "Pictures" not in file_cats  # Too small to be categorized
         assert "Code" not in file_cats  # Too small to be categorized
 
-    @patch("zpace.core.tqdm")
-    def test_scan_with_categorized_files(self, mock_tqdm, fs):
-        mock_pbar = MagicMock()
-        mock_tqdm.return_value.__enter__.return_value = mock_pbar
-
+    def test_scan_with_categorized_files(self, fs):
         # Create files with sufficient size to be categorized
-        fs.create_file("/test/doc.pdf", contents="x" * MIN_FILE_SIZE)
-        fs.create_file("/test/image.jpg", contents="x" * MIN_FILE_SIZE)
+        fs.create_file("/test/doc.pdf", contents=_MIN)
+        fs.create_file("/test/image.jpg", contents=_MIN)
 
         file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
-            Path("/test"), used_bytes=100000, min_size=MIN_FILE_SIZE
+            Path("/test"), min_size=MIN_FILE_SIZE
         )
 
         assert file_count == 2
@@ -316,71 +429,27 @@ class TestScanFilesAndDirs:
         assert len(file_cats["Documents"]) == 1
         assert len(file_cats["Pictures"]) == 1
 
-    @patch("zpace.core.tqdm")
-    def test_scan_nonexistent_directory(self, mock_tqdm):
-        mock_pbar = MagicMock()
-        mock_tqdm.return_value.__enter__.return_value = mock_pbar
-
+    def test_scan_nonexistent_directory(self):
         # Should handle gracefully
-        result = scan_files_and_dirs(Path("/nonexistent/path"), used_bytes=100000)
+        result = scan_files_and_dirs(Path("/nonexistent/path"))
         # Returns empty results for nonexistent path
         assert result[2] == 0  # file_count
         assert result[3] == 0  # total_size
 
-    @patch("zpace.core.tqdm")
-    def test_complex_filesystem_scan(self, mock_tqdm, fs):
-        """Test scanning a complex filesystem with various file types and directories."""
-        mock_pbar = MagicMock()
-        mock_tqdm.return_value.__enter__.return_value = mock_pbar
-
-        # Create files with appropriate sizes
-        fs.create_file("/test/node_modules/node.js", contents="x" * (MIN_FILE_SIZE + 50000))
-
-        fs.create_file("/test/venv/python.py", contents="x" * (MIN_FILE_SIZE + 50000))
-
-        fs.create_file("/test/image.jpg", contents="x" * (MIN_FILE_SIZE + 50000))
-        fs.create_file("/test/script.py", contents="x" * (MIN_FILE_SIZE + 10000))
-        fs.create_file("/test/large_file.dat", contents="x" * (MIN_FILE_SIZE * 2))
-
-        fs.create_file("/test/documents/report.pdf", contents="x" * (MIN_FILE_SIZE + 20000))
-        fs.create_file("/test/documents/data.xlsx", contents="x" * (MIN_FILE_SIZE + 15000))
-        fs.create_file("/test/documents/small.txt", contents="x")  # Small file
-
-        fs.create_file("/test/documents/subdocs/notes.doc", contents="x" * (MIN_FILE_SIZE + 5000))
-
-        fs.create_file("/test/code/main.js", contents="x" * (MIN_FILE_SIZE + 8000))
-        fs.create_file("/test/code/config.yml", contents="x" * (MIN_FILE_SIZE + 3000))
-        fs.create_file("/test/code/src/utils.py", contents="x" * (MIN_FILE_SIZE + 7000))
-
-        fs.create_file("/test/dev/device.file", contents="x" * (MIN_FILE_SIZE + 10000))
+    def test_progress_reports_every_scanned_byte(self, scan_tree):
+        reported = []
 
         file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
-            Path("/test"), used_bytes=100000000, min_size=MIN_FILE_SIZE
+            scan_tree / "complex", min_size=MIN_FILE_SIZE, progress=reported.append
         )
 
-        # Verify file categories
-        assert "Pictures" in file_cats
-        assert "Documents" in file_cats
-        assert "Code" in file_cats
-        assert "Config" in file_cats
-
-        # Verify special directories were detected and categorized
-        assert "Node Modules" in dir_cats
-        assert "Virtual Environments" in dir_cats
-
-        # Verify small file was filtered out
-        documents = file_cats.get("Documents", [])
-        # Results are now strings in the second part of the tuple
-        document_files = [os.path.basename(f[1]) for f in documents]
-        assert "small.txt" not in document_files  # Should be filtered by size
+        assert reported
+        assert sum(reported) == total_size
 
     @pytest.mark.skipif(sys.platform == "win32", reason="Test specific to Unix-like systems")
-    @patch("zpace.core.tqdm")
     @patch("zpace.core.is_skip_path")
-    def test_skip_directories_respected(self, mock_is_skip, mock_tqdm, fs):
+    def test_skip_directories_respected(self, mock_is_skip, fs):
         """Test that system directories are properly skipped."""
-        mock_pbar = MagicMock()
-        mock_tqdm.return_value.__enter__.return_value = mock_pbar
 
         def is_skip_side_effect(path_str):
             return path_str in SKIP_DIRS
@@ -388,21 +457,19 @@ class TestScanFilesAndDirs:
         mock_is_skip.side_effect = is_skip_side_effect
 
         # Create files
-        fs.create_file("/system.file", contents="x" * MIN_FILE_SIZE)
-        fs.create_file("/home/user.file", contents="x" * MIN_FILE_SIZE)
-        fs.create_file("/dev/should_be_skipped.file", contents="x" * MIN_FILE_SIZE)
-        fs.create_file("/proc/also_skipped.file", contents="x" * MIN_FILE_SIZE)
-        fs.create_file("/normal_dir/normal.file", contents="x" * MIN_FILE_SIZE)
-        fs.create_file("/home/user/user_doc.pdf", contents="x" * MIN_FILE_SIZE)
+        fs.create_file("/system.file", contents=_MIN)
+        fs.create_file("/home/user.file", contents=_MIN)
+        fs.create_file("/dev/should_be_skipped.file", contents=_MIN)
+        fs.create_file("/proc/also_skipped.file", contents=_MIN)
+        fs.create_file("/normal_dir/normal.file", contents=_MIN)
+        fs.create_file("/home/user/user_doc.pdf", contents=_MIN)
 
         file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
-            Path("/"), used_bytes=100000000, min_size=MIN_FILE_SIZE
+            Path("/"), min_size=MIN_FILE_SIZE
         )
 
         # Files in skipped directories should not be included
-        all_files = []
-        for category_files in file_cats.values():
-            all_files.extend([os.path.basename(f[1]) for f in category_files])
+        all_files = _names(file_cats)
 
         assert "should_be_skipped.file" not in all_files
         assert "also_skipped.file" not in all_files
@@ -414,50 +481,10 @@ class TestScanFilesAndDirs:
             or "system.file" in all_files
         )
 
-    @patch("zpace.core.tqdm")
-    def test_special_directories_not_descended(self, mock_tqdm, fs):
-        """Test that special directories are treated as atomic units and not descended into."""
-        mock_pbar = MagicMock()
-        mock_tqdm.return_value.__enter__.return_value = mock_pbar
-
-        # Create files
-        fs.create_file("/project/README.md", contents="x" * MIN_FILE_SIZE)
-        fs.create_file("/project/src/main.py", contents="x" * MIN_FILE_SIZE)
-        # These files inside special dirs should not be individually scanned
-        fs.create_file("/project/node_modules/package.json", contents="x" * MIN_FILE_SIZE)
-        fs.create_file("/project/venv/python", contents="x" * MIN_FILE_SIZE)
-
-        file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
-            Path("/project"), used_bytes=100000000, min_size=MIN_FILE_SIZE
-        )
-
-        # Verify special directories were categorized
-        assert "Node Modules" in dir_cats
-        assert "Virtual Environments" in dir_cats
-
-        # Verify we have files from non-special directories
-        assert "Code" in file_cats or "Documents" in file_cats
-
-    @patch("zpace.core.tqdm")
-    def test_mixed_file_types_and_sizes(self, mock_tqdm, fs):
+    def test_mixed_file_types_and_sizes(self, scan_tree):
         """Test scanning with mixed file types and sizes."""
-        mock_pbar = MagicMock()
-        mock_tqdm.return_value.__enter__.return_value = mock_pbar
-
-        # Create files with different sizes
-        fs.create_file("/mixed/huge_video.mp4", contents="x" * (MIN_FILE_SIZE * 10))
-        fs.create_file(
-            "/mixed/small_image.jpg", contents="x" * (MIN_FILE_SIZE // 2)
-        )  # Below threshold
-        fs.create_file("/mixed/medium_doc.pdf", contents="x" * (MIN_FILE_SIZE + 5000))
-        fs.create_file("/mixed/config.json", contents="x" * (MIN_FILE_SIZE + 2000))
-        fs.create_file(
-            "/mixed/tiny_script.py", contents="x" * (MIN_FILE_SIZE // 3)
-        )  # Below threshold
-        fs.create_file("/mixed/large_archive.zip", contents="x" * (MIN_FILE_SIZE * 5))
-
         file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
-            Path("/mixed"), used_bytes=100000000, min_size=MIN_FILE_SIZE
+            scan_tree / "mixed", min_size=MIN_FILE_SIZE
         )
 
         # Verify only files above minimum size are categorized
@@ -468,63 +495,48 @@ class TestScanFilesAndDirs:
         # At least some files should be categorized
         assert len(file_cats) > 0
 
-    @patch("zpace.core.tqdm")
-    def test_top_n_limits_results_per_category(self, mock_tqdm, fs):
-        """Test that top_n limits results and returns largest items sorted descending."""
-        mock_pbar = MagicMock()
-        mock_tqdm.return_value.__enter__.return_value = mock_pbar
-
-        # Create 5 documents with varying sizes
-        fs.create_file("/test/doc1.pdf", contents="x" * (MIN_FILE_SIZE + 1000))
-        fs.create_file("/test/doc2.pdf", contents="x" * (MIN_FILE_SIZE + 5000))
-        fs.create_file("/test/doc3.pdf", contents="x" * (MIN_FILE_SIZE + 3000))
-        fs.create_file("/test/doc4.pdf", contents="x" * (MIN_FILE_SIZE + 4000))
-        fs.create_file("/test/doc5.pdf", contents="x" * (MIN_FILE_SIZE + 2000))
-
-        file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
-            Path("/test"), used_bytes=100000000, min_size=MIN_FILE_SIZE, top_n=2
+    @pytest.mark.parametrize(
+        "subtree, top_n, expected_counts",
+        [
+            ("top_docs", 2, {"Documents": 2}),
+            ("top_multi", 1, {"Documents": 1, "Pictures": 1}),
+            ("mixed", 1, {"Videos": 1, "Documents": 1, "Config": 1, "Archives": 1}),
+            ("top_dirs", 2, {"Node Modules": 2}),
+        ],
+    )
+    def test_top_n_keeps_largest_per_category(self, scan_tree, subtree, top_n, expected_counts):
+        """Test that top_n applies to each category independently and keeps the largest items."""
+        file_cats, dir_cats, _, _ = scan_files_and_dirs(
+            scan_tree / subtree, min_size=MIN_FILE_SIZE, top_n=top_n
+        )
+        all_files, all_dirs, _, _ = scan_files_and_dirs(
+            scan_tree / subtree, min_size=MIN_FILE_SIZE, top_n=100
         )
 
-        # Should only have 2 documents (top_n=2)
-        assert len(file_cats["Documents"]) == 2
-        # Should be sorted descending (largest first)
-        sizes = [size for size, _ in file_cats["Documents"]]
-        assert sizes[0] > sizes[1]
-        # Should contain the two largest
-        assert sizes[0] >= MIN_FILE_SIZE + 4000
-        assert sizes[1] >= MIN_FILE_SIZE + 4000
-
-    @patch("zpace.core.tqdm")
-    def test_top_n_multiple_categories(self, mock_tqdm, fs):
-        """Test that top_n applies independently to each category."""
-        mock_pbar = MagicMock()
-        mock_tqdm.return_value.__enter__.return_value = mock_pbar
-
-        # Create files in multiple categories
-        fs.create_file("/test/doc1.pdf", contents="x" * (MIN_FILE_SIZE + 1000))
-        fs.create_file("/test/doc2.pdf", contents="x" * (MIN_FILE_SIZE + 2000))
-        fs.create_file("/test/img1.jpg", contents="x" * (MIN_FILE_SIZE + 3000))
-        fs.create_file("/test/img2.jpg", contents="x" * (MIN_FILE_SIZE + 4000))
-        fs.create_file("/test/img3.jpg", contents="x" * (MIN_FILE_SIZE + 5000))
+        limited = {**file_cats, **dir_cats}
+        unlimited = {**all_files, **all_dirs}
+        assert {category: len(entries) for category, entries in limited.items()} == expected_counts
+        for category, entries in limited.items():
+            # Sorted descending, and the same as the head of the unlimited result
+            assert entries == unlimited[category][:top_n]
 
+    def test_top_n_limits_special_directories(self, scan_tree):
+        """Test that top_n also applies to special directories, largest first."""
         file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
-            Path("/test"), used_bytes=100000000, min_size=MIN_FILE_SIZE, top_n=1
+            scan_tree / "top_dirs", min_size=MIN_FILE_SIZE, top_n=2
         )
 
-        # Each category should have only 1 item (top_n=1)
-        assert len(file_cats["Documents"]) == 1
-        assert len(file_cats["Pictures"]) == 1
-        # Each should be the largest in its category
-        assert file_cats["Documents"][0][0] >= MIN_FILE_SIZE + 2000
-        assert file_cats["Pictures"][0][0] >= MIN_FILE_SIZE + 5000
+        node_modules = dir_cats["Node Modules"]
+        assert [os.path.basename(os.path.dirname(p)) for _, p in node_modules] == [
+            "project1",
+            "project2",
+        ]
+        assert node_modules[0][0] > node_modules[1][0]
 
     @pytest.mark.skipif(sys.platform == "win32", reason="Test specific to Unix-like systems")
-    @patch("zpace.core.tqdm")
     @patch("zpace.core.is_skip_path")
-    def test_skip_directories_in_nested_paths(self, mock_is_skip, mock_tqdm, fs):
+    def test_skip_directories_in_nested_paths(self, mock_is_skip, fs):
         """Test that system directories are skipped even when nested in scan path."""
-        mock_pbar = MagicMock()
-        mock_tqdm.return_value.__enter__.return_value = mock_pbar
 
         def is_skip_side_effect(path_str):
             return path_str in SKIP_DIRS
@@ -532,151 +544,351 @@ class TestScanFilesAndDirs:
         mock_is_skip.side_effect = is_skip_side_effect
 
         # Create files
-        fs.create_file("/home/user/normal.file", contents="x" * MIN_FILE_SIZE)
-        fs.create_file("/dev/should/skip.file", contents="x" * MIN_FILE_SIZE)
-        fs.create_file("/usr/bin/binary", contents="x" * MIN_FILE_SIZE)
+        fs.create_file("/home/user/normal.file", contents=_MIN)
+        fs.create_file("/dev/should/skip.file", contents=_MIN)
+        fs.create_file("/usr/bin/binary", contents=_MIN)
 
         file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
-            Path("/"), used_bytes=1000000, min_size=MIN_FILE_SIZE
+            Path("/"), min_size=MIN_FILE_SIZE
         )
 
         # Collect all scanned files
-        all_files = []
-        for category_files in file_cats.values():
-            all_files.extend([os.path.basename(f[1]) for f in category_files])
+        all_files = _names(file_cats)
 
         # Files in /dev should not appear
         assert "skip.file" not in all_files
         # Files outside /dev should appear
         assert len(all_files) > 0  # Some files should be found
 
-    @patch("zpace.core.tqdm")
-    def test_only_small_files(self, mock_tqdm, fs):
-        """Test directory with only files below minimum size."""
-        mock_pbar = MagicMock()
-        mock_tqdm.return_value.__enter__.return_value = mock_pbar
+    @pytest.mark.skipif(sys.platform == "win32", reason="Test specific to Unix-like systems")
+    def test_skip_dir_names_only_match_at_their_level(self, fs):
+        """Test that a nested directory sharing a skip dir's name is still scanned."""
+        fs.create_file("/home/dev/kept.pdf", contents=_MIN)
+        fs.create_file("/home/run/also_kept.pdf", contents=_MIN)
+        fs.create_file("/var/run/skipped.pdf", contents=_MIN)
+
+        file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
+            Path("/"), min_size=MIN_FILE_SIZE
+        )
 
-        fs.create_file("/small_files/tiny1.txt", contents="x")
-        fs.create_file("/small_files/tiny2.jpg", contents="x")
-        fs.create_file("/small_files/tiny3.py", contents="x")
+        all_files = _names(file_cats)
+        assert "kept.pdf" in all_files
+        assert "also_kept.pdf" in all_files
+        assert "skipped.pdf" not in all_files
+
+    def test_track_paths_reports_subtree_size(self, fs):
+        """Test that a tracked subtree is measured in the same pass as the scan."""
+        fs.create_file("/home/.Trash/old.pdf", contents=_MIN)
+        fs.create_file("/home/.Trash/tiny.txt", contents=bytes(1))
+        fs.create_file("/home/.Trash/project/node_modules/pkg.js", contents=bytes(500))
+        fs.create_file("/home/.Trash_other/keep.pdf", contents=_MIN)
+        fs.create_file("/home/keep.mp4", contents=_MIN)
+
+        track_paths = {"/home/.Trash": 0}
+        scan_files_and_dirs(Path("/home"), min_size=MIN_FILE_SIZE, track_paths=track_paths)
+
+        assert track_paths["/home/.Trash"] == calculate_dir_size("/home/.Trash")
+
+    def test_can_track_path_only_below_listed_directories(self):
+        assert can_track_path("/home", os.path.join("/home", "u", ".Trash"))
+        # A special directory is sized as a whole: fine for itself, not for what is inside
+        assert can_track_path("/home", os.path.join("/home", "u", "tmp"))
+        assert not can_track_path("/home", os.path.join("/home", "u", "tmp", "Trash"))
+        assert not can_track_path("/home", os.path.join("/home", "build", "x", ".Trash"))
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="Skip dirs are POSIX paths")
+    def test_cannot_track_path_below_skip_dir(self):
+        assert not can_track_path("/", "/private/var/root/.Trash")
+        assert can_track_path("/private/var", "/private/var/root/.Trash")
+
+    def test_large_special_directory_sized_in_chunks(self, fs, monkeypatch):
+        """Test that a special dir split across several pool tasks is sized as one unit."""
+        monkeypatch.setattr("zpace.core.SPECIAL_DIR_BATCH_SIZE", 2)
+        for i in range(12):
+            fs.create_file(f"/test/node_modules/pkg{i}/lib/index.js", contents=bytes(20000))
+        fs.create_file("/test/other/node_modules/small.js", contents=bytes(10))
 
         file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
-            Path("/small_files"), used_bytes=1000000, min_size=MIN_FILE_SIZE
+            Path("/test"), min_size=1, workers=4
+        )
+
+        expected = calculate_dir_size("/test/node_modules")
+        assert dir_cats["Node Modules"][0] == (expected, os.path.join("/test", "node_modules"))
+        assert len(dir_cats["Node Modules"]) == 2
+        assert total_size == expected + calculate_dir_size("/test/other/node_modules")
+
+    def test_only_small_files(self, fs):
+        """Test directory with only files below minimum size."""
+        fs.create_file("/small_files/tiny1.txt", contents=bytes(1))
+        fs.create_file("/small_files/tiny2.jpg", contents=bytes(1))
+        fs.create_file("/small_files/tiny3.py", contents=bytes(1))
+
+        file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
+            Path("/small_files"), min_size=MIN_FILE_SIZE
         )
 
         assert file_count == 3  # Files are still counted
         assert total_size > 0  # Size is still accumulated
         assert file_cats == {}  # But no files meet the minimum size for categorization
 
-    @patch("zpace.core.tqdm")
-    def test_deeply_nested_structure(self, mock_tqdm, fs):
+    def test_deeply_nested_structure(self, scan_tree):
         """Test scanning deeply nested directory structure."""
-        mock_pbar = MagicMock()
-        mock_tqdm.return_value.__enter__.return_value = mock_pbar
-
-        fs.create_file("/deep/level1/file_at_level1.txt", contents="x" * MIN_FILE_SIZE)
-        fs.create_file("/deep/level1/level2/file_at_level2.txt", contents="x" * MIN_FILE_SIZE)
-        fs.create_file(
-            "/deep/level1/level2/level3/file_at_level3.txt", contents="x" * MIN_FILE_SIZE
-        )
-        fs.create_file(
-            "/deep/level1/level2/level3/level4/file_at_level4.txt", contents="x" * MIN_FILE_SIZE
-        )
-        fs.create_file(
-            "/deep/level1/level2/level3/level4/level5/file_at_level5.txt",
-            contents="x" * MIN_FILE_SIZE,
-        )
-
         file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
-            Path("/deep"), used_bytes=1000000, min_size=MIN_FILE_SIZE
+            scan_tree / "deep", min_size=MIN_FILE_SIZE
         )
 
-        assert file_count == 5  # 5 levels
+        assert file_count == DEEP_TREE_LEVELS  # One file per level
         assert "Documents" in file_cats
-        assert len(file_cats["Documents"]) == 5
+        assert len(file_cats["Documents"]) == DEEP_TREE_LEVELS
+
+    def test_results_do_not_depend_on_worker_count(self, fs):
+        for i in range(4):
+            fs.create_file(f"/tree/dir{i}/clip{i}.mp4", contents=bytes(MIN_FILE_SIZE + i * 5000))
+            fs.create_file(f"/tree/dir{i}/node_modules/lib.js", contents=_MIN)
+            fs.create_file(f"/tree/dir{i}/sub/notes{i}.txt", contents=_MIN)
+
+        serial = scan_files_and_dirs(Path("/tree"), top_n=3, workers=1)
+        parallel = scan_files_and_dirs(Path("/tree"), top_n=3, workers=4)
+
+        assert serial == parallel
+        assert serial[2] == 8
+        assert len(serial[1]["Node Modules"]) == 3
+
+
+@pytest.fixture(scope="module")
+def complex_scan(scan_tree):
+    """Result of scanning the complex subtree once, shared by TestComplexScan."""
+    return scan_files_and_dirs(scan_tree / "complex", min_size=MIN_FILE_SIZE)
+
+
+class TestComplexScan:
+    """Test scanning a complex filesystem with various file types and directories."""
+
+    def test_categorizes_files(self, complex_scan):
+        file_cats, _, _, _ = complex_scan
+        assert {"Pictures", "Documents", "Code", "Config"} <= file_cats.keys()
+
+    def test_detects_special_directories(self, complex_scan):
+        _, dir_cats, _, _ = complex_scan
+        assert dir_cats.keys() == {"Node Modules", "Virtual Environments"}
+
+    def test_special_directories_not_descended(self, complex_scan):
+        """Files inside special dirs are counted in the dir's size, not listed or counted."""
+        file_cats, _, file_count, _ = complex_scan
+        names = _names(file_cats)
+        assert "node.js" not in names
+        assert "python.py" not in names
+        assert file_count == 11
+
+    def test_filters_small_files(self, complex_scan):
+        file_cats, _, _, _ = complex_scan
+        assert "small.txt" not in _names(file_cats)  # Should be filtered by size
+
+    def test_total_size_includes_special_directories(self, complex_scan):
+        _, dir_cats, _, total_size = complex_scan
+        special_size = sum(size for cat in dir_cats.values() for size, _ in cat)
+        assert total_size > special_size > 2 * MIN_FILE_SIZE
+
+
+class TestScanDirEntries:
+    """Test scanning a single directory level."""
+
+    def test_reports_without_descending(self, fs):
+        fs.create_file("/test/video.mp4", contents=_MIN)
+        fs.create_file("/test/tiny.txt", contents=bytes(1))
+        fs.create_file("/test/sub/nested.pdf", contents=_MIN)
+        fs.create_dir("/test/node_modules")
+
+        dirs_to_visit, special_dirs, files, file_count, _ = scan_dir_entries("/test", MIN_FILE_SIZE)
+
+        assert dirs_to_visit == [os.path.join("/test", "sub")]
+        assert [(path, DIR_CATEGORY_NAMES[cat]) for path, cat in special_dirs] == [
+            (os.path.join("/test", "node_modules"), "Node Modules")
+        ]
+        assert [(prefix + name, FILE_CATEGORY_NAMES[cat]) for _, prefix, name, cat in files] == [
+            (os.path.join("/test", "video.mp4"), "Videos")
+        ]
+        assert file_count == 2
+
+    def test_categorizes_by_last_extension(self, fs):
+        fs.create_file("/test/CLIP.MP4", contents=_MIN)
+        fs.create_file("/test/backup.tar.gz", contents=_MIN)
+        fs.create_file("/test/.mp4", contents=_MIN)
+        fs.create_file("/test/noext", contents=_MIN)
+
+        _, _, files, _, _ = scan_dir_entries("/test", MIN_FILE_SIZE)
+
+        categories = {name: FILE_CATEGORY_NAMES[cat] for _, _, name, cat in files}
+        assert categories == {
+            "CLIP.MP4": "Videos",
+            "backup.tar.gz": "Archives",
+            ".mp4": "Others",
+            "noext": "Others",
+        }
+
+    def test_reports_macos_apps_and_mixed_case_names(self, fs):
+        fs.create_dir("/test/Safari.app")
+        fs.create_dir("/test/Node_Modules")
+
+        _, special_dirs, _, _, _ = scan_dir_entries("/test", MIN_FILE_SIZE)
+
+        assert sorted(DIR_CATEGORY_NAMES[cat] for _, cat in special_dirs) == [
+            "Node Modules",
+            "macOS Apps",
+        ]
+
+    def test_unreadable_directory_reports_nothing(self):
+        assert scan_dir_entries("/nonexistent/path", MIN_FILE_SIZE) == ([], [], [], 0, 0)
+
+    def test_batch_combines_directories(self, fs):
+        fs.create_file("/a/one.pdf", contents=_MIN)
+        fs.create_file("/a/sub/skipped_by_batch.pdf", contents=_MIN)
+        fs.create_file("/b/two.mp4", contents=_MIN)
+        fs.create_file("/b/tiny.txt", contents=bytes(1))
+
+        (dirs_to_visit, _, files, file_count, _), _ = scan_dir_batch(
+            ["/a", "/b", "/missing"], MIN_FILE_SIZE
+        )
+
+        assert dirs_to_visit == [os.path.join("/a", "sub")]
+        assert sorted(FILE_CATEGORY_NAMES[cat] for *_, cat in files) == ["Documents", "Videos"]
+        assert file_count == 3
 
 
 class TestPrintResults:
     """Test output formatting."""
 
-    def test_print_empty_results(self):
-        with patch("sys.stdout", new=StringIO()) as fake_out:
-            print_results({}, {}, 80)
-            output = fake_out.getvalue()
-            assert "LARGEST FILES BY CATEGORY" not in output
-            assert "SPECIAL DIRECTORIES" not in output
+    def test_print_empty_results(self, capsys):
+        print_results({}, {}, 80)
+        output = capsys.readouterr().out
+        assert "LARGEST FILES BY CATEGORY" not in output
+        assert "SPECIAL DIRECTORIES" not in output
 
-    def test_print_populated_results(self):
+    def test_print_populated_results(self, capsys):
         file_cats = {"Documents": [(1024, "/doc.pdf")]}
         dir_cats = {"Node Modules": [(2048, "/node_modules")]}
 
-        with patch("sys.stdout", new=StringIO()) as fake_out:
-            print_results(file_cats, dir_cats, 80)
-            output = fake_out.getvalue()
+        print_results(file_cats, dir_cats, 80)
+        output = capsys.readouterr().out
+
+        assert "LARGEST FILES BY CATEGORY" in output
+        assert "SPECIAL DIRECTORIES" in output
+        assert "Documents (1 files)" in output
+        assert "Node Modules (1 directories)" in output
+        assert "1.00 KB" in output
+        assert "2.00 KB" in output
+
 
-            assert "LARGEST FILES BY CATEGORY" in output
-            assert "SPECIAL DIRECTORIES" in output
-            assert "Documents (1 files)" in output
-            assert "Node Modules (1 directories)" in output
-            assert "1.00 KB" in output
-            assert "2.00 KB" in output
+@pytest.fixture
+def patched_main(monkeypatch):
+    """Stub out disk usage, scanning and printing in main(); returns the scan mock."""
+    scan = MagicMock(return_value=({}, {}, 0, 0))
+    monkeypatch.setattr("zpace.main.scan_files_and_dirs", scan)
+    monkeypatch.setattr("zpace.main.get_disk_usage", lambda path: (100, 50, 50))
+    monkeypatch.setattr("zpace.main.print_results", lambda *args, **kwargs: None)
+    # Do not walk the real Trash
+    monkeypatch.setattr("zpace.main.get_trash_path", lambda: None)
+    return scan
 
 
 class TestMainArguments:
     """Test command line argument parsing."""
 
-    @patch("zpace.main.scan_files_and_dirs")
-    @patch("zpace.main.get_disk_usage")
-    @patch("zpace.main.print_results")
-    def test_default_arguments(self, mock_print, mock_disk, mock_scan):
-        mock_disk.return_value = (100, 50, 50)
-        mock_scan.return_value = ({}, {}, 0, 0)
+    def test_disk_usage_before_scan_and_trash_with_summary(self, patched_main, capsys):
+        with patch("sys.argv", ["main.py"]):
+            main()
+
+        out = capsys.readouterr().out
+        assert out.index("Used:") < out.index("SCANNING:") < out.index("SCAN COMPLETE!")
+        assert out.index("SCAN COMPLETE!") < out.index("Trash:")
+
+    @pytest.mark.parametrize(
+        "trash_kind, expected",
+        [
+            ("missing", "Trash: Not Found"),
+            ("file", "Trash: Not Found"),
+            ("unreadable", "Trash: Access Denied"),
+        ],
+    )
+    def test_trash_status(self, patched_main, monkeypatch, tmp_path, capsys, trash_kind, expected):
+        trash = tmp_path / "Trash"
+        if trash_kind == "file":
+            trash.write_bytes(b"")
+        elif trash_kind == "unreadable":
+            trash.mkdir()
+
+            def denied(path):
+                raise PermissionError(path)
+
+            monkeypatch.setattr("zpace.main.os.scandir", denied)
+        monkeypatch.setattr("zpace.main.get_trash_path", lambda: str(trash))
+
+        with patch("sys.argv", ["main.py", str(tmp_path)]):
+            main()
+
+        assert expected in capsys.readouterr().out
 
+    def test_default_arguments(self, patched_main):
         with patch("sys.argv", ["main.py"]):
             main()
 
-            # Verify scan called with default path (home)
-            args, _ = mock_scan.call_args
-            assert args[0] == Path.home()
+        # Verify scan called with default path (home)
+        args, _ = patched_main.call_args
+        assert args[0] == Path.home()
 
-    @patch("zpace.main.scan_files_and_dirs")
-    @patch("zpace.main.get_disk_usage")
-    @patch("zpace.main.print_results")
-    def test_custom_arguments(self, mock_print, mock_disk, mock_scan):
-        mock_disk.return_value = (100, 50, 50)
-        mock_scan.return_value = ({}, {}, 0, 0)
-
-        # We need to mock Path.exists to return True for our test path
-        # OR we can just use a path that we know won't be checked for existence
-        # because we are mocking the scan function.
-        # However, main() checks for existence before calling scan.
-
-        with patch("pathlib.Path.exists", return_value=True):
-            with patch("pathlib.Path.is_dir", return_value=True):
-                test_path = "/Users/test/data"
-                with patch("sys.argv", ["main.py", test_path, "--min-size", "500", "--top", "5"]):
-                    main()
-
-                    # Verify scan called with correct args
-                    args, kwargs = mock_scan.call_args
-                    # Compare resolved Path objects to handle OS-specific separators and drive letters
-                    # main.py calls resolve(), so we must too
-                    assert Path(args[0]) == Path(test_path).resolve()
-                    # min_size is the 3rd positional argument (index 2)
-                    assert args[2] == 500 * 1024  # KB to Bytes
+    def test_custom_arguments(self, patched_main):
+        # main() checks that the path exists and is a directory before calling scan
+        test_path = "/Users/test/data"
+        with (
+            patch("pathlib.Path.exists", return_value=True),
+            patch("pathlib.Path.is_dir", return_value=True),
+            patch(
+                "sys.argv",
+                ["main.py", test_path, "--min-size", "500", "--top", "5", "--jobs", "3"],
+            ),
+        ):
+            main()
+
+        # Verify scan called with correct args
+        args, kwargs = patched_main.call_args
+        # Compare resolved Path objects to handle OS-specific separators and drive letters
+        # main.py calls resolve(), so we must too
+        assert Path(args[0]) == Path(test_path).resolve()
+        # min_size is the 2nd positional argument (index 1)
+        assert args[1] == 500 * 1024  # KB to Bytes
+        assert kwargs["top_n"] == 5
+        assert kwargs["workers"] == 3
+
+    def test_jobs_must_be_positive(self, patched_main):
+        with patch("sys.argv", ["main.py", "-j", "0"]), pytest.raises(SystemExit):
+            main()
+
+        patched_main.assert_not_called()
+
+    @pytest.mark.parametrize("is_mount, expected_total", [(True, 50.0), (False, None)])
+    def test_progress_total_only_for_mount_points(
+        self, patched_main, monkeypatch, is_mount, expected_total
+    ):
+        mock_tqdm = MagicMock()
+        monkeypatch.setattr("zpace.main.tqdm", mock_tqdm)
+        monkeypatch.setattr("zpace.main.os.path.ismount", lambda path: is_mount)
+
+        with patch("sys.argv", ["main.py"]):
+            main()
+
+        _, kwargs = mock_tqdm.call_args
+        assert kwargs["total"] == expected_total
+        # Interactive mode leaves tqdm to hide the bar when stderr is not a terminal
+        assert kwargs["disable"] is None
 
 
 class TestSymlinkHandling:
     """Test symlink handling to prevent infinite loops."""
 
-    @patch("zpace.core.tqdm")
-    def test_symlink_loop(self, mock_tqdm, fs):
-        mock_pbar = MagicMock()
-        mock_tqdm.return_value.__enter__.return_value = mock_pbar
-
+    def test_symlink_loop(self, fs):
         # Create a directory structure
         fs.create_dir("/test/subdir")
-        fs.create_file("/test/file.txt", contents="x" * MIN_FILE_SIZE)
+        fs.create_file("/test/file.txt", contents=_MIN)
 
         # Create a symlink pointing back to parent (loop)
         # Note: pyfakefs supports symlinks
@@ -685,76 +897,58 @@ class TestSymlinkHandling:
         # Scan should complete without infinite recursion
         # We set a timeout or just rely on the test finishing
         file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
-            Path("/test"), used_bytes=100000, min_size=MIN_FILE_SIZE
+            Path("/test"), min_size=MIN_FILE_SIZE
         )
 
         # Should count the real file
         assert file_count == 1
         # Should NOT count the symlinked file (as we don't follow symlinks)
 
-    @patch("zpace.core.tqdm")
-    def test_symlink_to_file(self, mock_tqdm, fs):
-        mock_pbar = MagicMock()
-        mock_tqdm.return_value.__enter__.return_value = mock_pbar
-
-        fs.create_file("/test/real_file.txt", contents="x" * MIN_FILE_SIZE)
+    def test_symlink_to_file(self, fs):
+        fs.create_file("/test/real_file.txt", contents=_MIN)
         fs.create_symlink("/test/link_file.txt", "/test/real_file.txt")
 
         file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
-            Path("/test"), used_bytes=100000, min_size=MIN_FILE_SIZE
+            Path("/test"), min_size=MIN_FILE_SIZE
         )
 
         # Should only count the real file, not the symlink
         assert file_count == 1
 
-    def test_symlink_rejection_in_main(self):
+    def test_symlink_rejection_in_main(self, monkeypatch, capsys):
         """Test that main() rejects symlinks."""
-        with (
-            patch("sys.argv", ["main.py", "/tmp/link"]),
-            patch("pathlib.Path.expanduser") as mock_expand,
-            patch("pathlib.Path.is_symlink", return_value=True),
-            patch("pathlib.Path.is_dir", return_value=True),
-            patch("pathlib.Path.resolve", return_value=Path("/real/path")),
-            patch("pathlib.Path.exists", return_value=True),
-            patch("zpace.main.get_disk_usage", return_value=(100, 50, 50)),
-            patch("shutil.get_terminal_size") as mock_term,
-            patch("sys.exit") as mock_exit,
-            patch("builtins.print") as mock_print,
-        ):
-            mock_expand.return_value = Path("/tmp/link")
-            mock_term.return_value.columns = 80
-
-            import main as main_module
-
-            try:
-                main_module.main()
-            except Exception:
-                pass
-
-            mock_exit.assert_not_called()
-            expected_msg = (
-                f"Attention - you provided a symlink: {Path('/tmp/link')}\n"
-                f"It points to this directory: {Path('/real/path')}\n"
-                f"If you wish to analyse the symlinked directory, please pass its path: {Path('/real/path')}"
-            )
-            mock_print.assert_any_call(expected_msg)
+        exit_calls = []
+        monkeypatch.setattr("sys.argv", ["main.py", "/tmp/link"])
+        monkeypatch.setattr(Path, "expanduser", lambda self: Path("/tmp/link"))
+        monkeypatch.setattr(Path, "is_symlink", lambda self: True)
+        monkeypatch.setattr(Path, "is_dir", lambda self: True)
+        monkeypatch.setattr(Path, "resolve", lambda self, strict=False: Path("/real/path"))
+        monkeypatch.setattr(Path, "exists", lambda self: True)
+        monkeypatch.setattr("zpace.main.get_disk_usage", lambda path: (100, 50, 50))
+        monkeypatch.setattr("shutil.get_terminal_size", lambda: os.terminal_size((80, 24)))
+        monkeypatch.setattr("sys.exit", exit_calls.append)
+
+        try:
+            main()
+        except Exception:
+            pass
+
+        assert exit_calls == []
+        expected_msg = (
+            f"Attention - you provided a symlink: {Path('/tmp/link')}\n"
+            f"It points to this directory: {Path('/real/path')}\n"
+            f"If you wish to analyse the symlinked directory, please pass its path: {Path('/real/path')}"
+        )
+        assert expected_msg in capsys.readouterr().out
 
 
 class TestUnicodeHandling:
     """Test handling of unicode filenames."""
 
-    @patch("zpace.core.tqdm")
-    def test_unicode_filenames(self, mock_tqdm, fs):
-        mock_pbar = MagicMock()
-        mock_tqdm.return_value.__enter__.return_value = mock_pbar
-
-        # Create files with unicode names
-        fs.create_file("/test/café.txt", contents="x" * MIN_FILE_SIZE)
-        fs.create_file("/test/🚀.png", contents="x" * MIN_FILE_SIZE)
-        fs.create_file("/test/こんにちは.doc", contents="x" * MIN_FILE_SIZE)
-
+    def test_unicode_filenames(self, scan_tree):
+        # Files with unicode names
         file_cats, dir_cats, file_count, total_size = scan_files_and_dirs(
-            Path("/test"), used_bytes=100000, min_size=MIN_FILE_SIZE
+            scan_tree / "unicode", min_size=MIN_FILE_SIZE
         )
 
         assert file_count == 3
@@ -762,7 +956,7 @@ class TestUnicodeHandling:
         assert "Pictures" in file_cats
 
         # Verify names are preserved
-        all_files = [os.path.basename(f[1]) for cat in file_cats.values() for f in cat]
+        all_files = _names(file_cats)
         assert "café.txt" in all_files
         assert "🚀.png" in all_files
         assert "こんにちは.doc" in all_files
@@ -1038,6 +1232,17 @@ extensions = [".custom"]
         load_user_categories_config()
         assert DEFAULT_CATEGORIES["Pictures"] == original_pictures
 
+    def test_uses_given_parsed_config(self, fs_with_config):
+        """A config that was already parsed is merged without reading the file."""
+        from zpace.config import load_user_categories_config, load_user_dirs_config
+
+        user_config = {
+            "categories": {"Fonts": {"extensions": [".ttf"]}},
+            "directories": {"Caches": {"dirs": ["cache"]}},
+        }
+        assert load_user_categories_config(user_config)["Fonts"] == {".ttf"}
+        assert load_user_dirs_config(user_config)["Caches"] == {"cache"}
+
 
 class TestScanResultToDict:
     """Test ScanResult.to_dict() serialization."""
@@ -1176,6 +1381,19 @@ class TestScanResultToJson:
         assert parsed["files_by_category"]["Code"][0]["path"] == "/a.py"
         assert parsed["files_by_category"]["Code"][1]["path"] == "/b.js"
 
+    def test_write_json_matches_to_json(self):
+        from zpace.output import ScanResult, FileEntry
+
+        result = ScanResult(
+            scan_path="/test",
+            timestamp="2026-01-01T00:00:00Z",
+            special_directories={"Git Repos": [FileEntry(path="/r/.git", size_bytes=300)]},
+        )
+        out = StringIO()
+        result.write_json(out)
+
+        assert out.getvalue() == result.to_json() + "\n"
+
 
 class TestBuildScanResult:
     """Test build_scan_result() factory function."""
@@ -1270,6 +1488,34 @@ class TestBuildScanResult:
         assert len(result.files_by_category["Videos"]) == 2
         assert len(result.files_by_category["Documents"]) == 1
         assert len(result.special_directories["Node Modules"]) == 2
+        # Categories come out in the order they are serialized
+        assert list(result.files_by_category) == ["Documents", "Videos"]
+
+    def test_entries_have_no_instance_dict(self):
+        from zpace.output import FileEntry, ScanSummary
+
+        assert not hasattr(FileEntry(path="/a", size_bytes=1), "__dict__")
+        assert not hasattr(ScanSummary(1, 0, 1), "__dict__")
+
+
+class TestRunInBackground:
+    """Test the background thread used to measure the Trash."""
+
+    def test_returns_result_and_exception(self):
+        assert run_in_background(len, "abc").result(timeout=5) == 3
+        with pytest.raises(ZeroDivisionError):
+            run_in_background(lambda: 1 // 0).result(timeout=5)
+
+    def test_does_not_hold_up_exit(self):
+        import subprocess
+
+        code = (
+            "import sys, time; from zpace.main import run_in_background; "
+            "run_in_background(time.sleep, 30); sys.exit(1)"
+        )
+        # Would time out if the interpreter waited for the pending task at exit
+        done = subprocess.run([sys.executable, "-c", code], timeout=10)
+        assert done.returncode == 1
 
 
 class TestMainJsonOutput:
@@ -1305,6 +1551,67 @@ class TestMainJsonOutput:
             assert "Documents" in parsed["files_by_category"]
             assert "Node Modules" in parsed["special_directories"]
 
+    @patch("zpace.main.get_cached_trash_size")
+    @patch("zpace.main.get_trash_path")
+    def test_trash_inside_scan_path_is_measured_by_the_scan(self, mock_trash, mock_calc, tmp_path):
+        import json
+
+        trash = tmp_path / "Trash"
+        trash.mkdir()
+        (trash / "old.bin").write_bytes(b"x" * 300 * 1024)
+        mock_trash.return_value = str(trash)
+
+        with (
+            patch("sys.argv", ["main.py", str(tmp_path), "--json"]),
+            patch("sys.stdout", new=StringIO()) as fake_out,
+        ):
+            main()
+            parsed = json.loads(fake_out.getvalue())
+
+        mock_calc.assert_not_called()
+        assert parsed["disk_usage"]["trash_bytes"] == calculate_dir_size(str(trash))
+        assert parsed["disk_usage"]["trash_bytes"] > 0
+
+    @patch("zpace.main.get_trash_path")
+    def test_trash_inside_special_dir_is_measured_on_its_own(self, mock_trash, tmp_path):
+        import json
+
+        # tmp/ is sized as a whole by the scan, which never reports what lies inside it
+        trash = tmp_path / "tmp" / "Trash"
+        trash.mkdir(parents=True)
+        (trash / "old.bin").write_bytes(b"x" * 300 * 1024)
+        mock_trash.return_value = str(trash)
+
+        with (
+            patch("sys.argv", ["main.py", str(tmp_path), "--json"]),
+            patch("sys.stdout", new=StringIO()) as fake_out,
+        ):
+            main()
+            parsed = json.loads(fake_out.getvalue())
+
+        assert parsed["disk_usage"]["trash_bytes"] == calculate_dir_size(str(trash))
+        assert parsed["disk_usage"]["trash_bytes"] > 0
+
+    @patch("zpace.main.get_trash_path")
+    def test_trash_outside_scan_path_is_measured_alongside_the_scan(self, mock_trash, tmp_path):
+        import json
+
+        trash = tmp_path / "Trash"
+        trash.mkdir()
+        (trash / "old.bin").write_bytes(b"x" * 300 * 1024)
+        (tmp_path / "scan").mkdir()
+        mock_trash.return_value = str(trash)
+
+        with (
+            patch("sys.argv", ["main.py", str(tmp_path / "scan"), "--json"]),
+            patch("sys.stdout", new=StringIO()) as fake_out,
+        ):
+            main()
+            parsed = json.loads(fake_out.getvalue())
+
+        assert parsed["disk_usage"]["trash_bytes"] == calculate_dir_size(str(trash))
+        assert parsed["scan_summary"]["total_size_bytes"] == 0
+
 
 class TestMainFileOutput:
     """Test -o flag in main()."""
@@ -1,17 +1,12 @@
+import os
 import sys
-from pathlib import Path
-from typing import Dict, Set
-
-if sys.version_info >= (3, 11):
-    import tomllib
-else:
-    try:
-        import tomli as tomllib
-    except ImportError:
-        tomllib = None  # type: ignore[assignment]
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, FrozenSet, Optional, Set, Tuple
 
 MIN_FILE_SIZE = 100 * 1024  # 100 KB
 DEFAULT_TOP_N = 10
+# Scanning waits on scandir/stat far more than it computes, so use more threads than cores
+DEFAULT_WORKERS = min(32, 2 * (os.cpu_count() or 1))
 USER_CONFIG_PATH = Path.home() / ".zpace.toml"
 
 # Use strings for faster lookups (avoiding Path object creation overhead during checks)
@@ -34,10 +29,22 @@ SKIP_DIRS: Set[str] = {
     "/.fseventsd",
 }
 
-# SKIP_DIRS contains only root-level system paths (e.g., /dev, /proc, /System).
-# We only check against SKIP_DIRS when level <= DEEPEST_SKIP_LEVEL as an optimization:
-# deeper scans (e.g., /home/user/project) can never encounter these paths.
-DEEPEST_SKIP_LEVEL = 3
+
+def _skip_names_by_level(skip_dirs: Set[str]) -> Dict[int, FrozenSet[str]]:
+    """Index SKIP_DIRS basenames by the level (path parts) of their parent directory."""
+    by_level: Dict[int, Set[str]] = {}
+    for path in skip_dirs:
+        parts = PurePosixPath(path).parts
+        by_level.setdefault(len(parts) - 1, set()).add(parts[-1])
+    return {level: frozenset(names) for level, names in by_level.items()}
+
+
+# SKIP_DIRS contains only shallow system paths (e.g., /dev, /proc, /private/var).
+# The scanner compares a directory's short name against the names at its level and only
+# checks the full path on a match; deeper scans (e.g., /home/user/project) find no names
+# at their level and skip the check entirely. The paths are POSIX, so where paths use
+# another separator (Windows) nothing can match and there is nothing to check.
+SKIP_NAMES_BY_LEVEL = _skip_names_by_level(SKIP_DIRS) if os.sep == "/" else {}
 
 DEFAULT_CATEGORIES: Dict[str, Set[str]] = {
     "Pictures": {
@@ -198,23 +205,38 @@ DEFAULT_SPECIAL_DIRS: Dict[str, Set[str]] = {
 }
 
 
-def _load_and_merge_config(
-    defaults: Dict[str, Set[str]], config_key: str, replace_key: str
-) -> Dict[str, Set[str]]:
-    """Load and merge user configuration from ~/.zpace.toml."""
-    result = {cat: items.copy() for cat, items in defaults.items()}
-
+def _read_user_config() -> Dict[str, Any]:
+    """Parse ~/.zpace.toml; empty if it is missing or unreadable."""
+    # Most users have no config file, so the TOML parser is only imported when there is one
     if not USER_CONFIG_PATH.exists():
-        return result
+        return {}
 
-    if tomllib is None:
-        return result
+    if sys.version_info >= (3, 11):
+        import tomllib
+    else:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            return {}
 
     try:
         with open(USER_CONFIG_PATH, "rb") as f:
-            user_config = tomllib.load(f)
+            return tomllib.load(f)
     except Exception:
-        return result
+        return {}
+
+
+def _load_and_merge_config(
+    defaults: Dict[str, Set[str]],
+    config_key: str,
+    replace_key: str,
+    user_config: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Set[str]]:
+    """Merge user configuration (read from ~/.zpace.toml unless given) into defaults."""
+    result = {cat: items.copy() for cat, items in defaults.items()}
+
+    if user_config is None:
+        user_config = _read_user_config()
 
     user_items = user_config.get(config_key, {})
     for cat_name, cat_config in user_items.items():
@@ -231,20 +253,38 @@ def _load_and_merge_config(
     return result
 
 
-def load_user_categories_config() -> Dict[str, Set[str]]:
+def load_user_categories_config(
+    user_config: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Set[str]]:
     """Load and merge user file category configuration from ~/.zpace.toml."""
-    return _load_and_merge_config(DEFAULT_CATEGORIES, "categories", "extensions")
+    return _load_and_merge_config(DEFAULT_CATEGORIES, "categories", "extensions", user_config)
 
 
-def load_user_dirs_config() -> Dict[str, Set[str]]:
+def load_user_dirs_config(user_config: Optional[Dict[str, Any]] = None) -> Dict[str, Set[str]]:
     """Load and merge user directory configuration from ~/.zpace.toml."""
-    return _load_and_merge_config(DEFAULT_SPECIAL_DIRS, "directories", "dirs")
+    return _load_and_merge_config(DEFAULT_SPECIAL_DIRS, "directories", "dirs", user_config)
 
 
-CATEGORIES = load_user_categories_config()
-SPECIAL_DIRS = load_user_dirs_config()
+# Read the config file once for both sections
+_USER_CONFIG = _read_user_config()
+CATEGORIES = load_user_categories_config(_USER_CONFIG)
+SPECIAL_DIRS = load_user_dirs_config(_USER_CONFIG)
 
 # Pre-compute lookups for O(1) access
 EXTENSION_MAP = {ext: cat for cat, exts in CATEGORIES.items() for ext in exts}
 SPECIAL_DIR_MAP = {name: cat for cat, names in SPECIAL_DIRS.items() for name in names}
+
+# Category IDs: the scanner keeps per-category results in lists indexed by these positions
+# instead of dicts keyed by category name, and maps back to names only once it is done
+FILE_CATEGORY_NAMES: Tuple[str, ...] = tuple(dict.fromkeys([*CATEGORIES, "Others"]))
+OTHERS_CATEGORY_ID = FILE_CATEGORY_NAMES.index("Others")
+EXTENSION_CATEGORY_IDS = {ext: FILE_CATEGORY_NAMES.index(cat) for ext, cat in EXTENSION_MAP.items()}
+DIR_CATEGORY_NAMES: Tuple[str, ...] = tuple(dict.fromkeys([*SPECIAL_DIRS, "macOS Apps"]))
+MACOS_APPS_CATEGORY_ID = DIR_CATEGORY_NAMES.index("macOS Apps")
+SPECIAL_DIR_CATEGORY_IDS = {
+    name: DIR_CATEGORY_NAMES.index(cat) for name, cat in SPECIAL_DIR_MAP.items()
+}
 PROGRESS_UPDATE_THRESHOLD = 10 * 1024 * 1024  # 10 MB
+PROGRESS_MIN_INTERVAL = 0.25  # seconds between progress bar redraws
+# json.dump writes many small chunks; a large buffer turns them into few big writes
+OUTPUT_BUFFER_SIZE = 256 * 1024
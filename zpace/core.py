@@ -1,21 +1,51 @@
 import heapq
 import os
-from collections import defaultdict
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-
-from tqdm import tqdm
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
 
 from zpace.config import (
-    DEEPEST_SKIP_LEVEL,
     DEFAULT_TOP_N,
+    DEFAULT_WORKERS,
+    DIR_CATEGORY_NAMES,
+    EXTENSION_CATEGORY_IDS,
     EXTENSION_MAP,
+    FILE_CATEGORY_NAMES,
+    MACOS_APPS_CATEGORY_ID,
     MIN_FILE_SIZE,
+    OTHERS_CATEGORY_ID,
     PROGRESS_UPDATE_THRESHOLD,
     SKIP_DIRS,
+    SKIP_NAMES_BY_LEVEL,
+    SPECIAL_DIR_CATEGORY_IDS,
     SPECIAL_DIR_MAP,
 )
 
+# Scanning an open directory fd makes DirEntry.stat() an fstatat() relative to that fd
+# instead of a stat() that re-walks every component of the absolute path.
+SCANDIR_ACCEPTS_FD = os.scandir in os.supports_fd
+DIR_OPEN_FLAGS = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0) | getattr(os, "O_CLOEXEC", 0)
+
+# st_blocks is 512-byte blocks, reliable on unix; fall back to st_size where stat results
+# don't have it (e.g. windows). Decided once instead of per stat result.
+HAS_ST_BLOCKS = hasattr(os.stat_result, "st_blocks")
+
+NO_SKIP_NAMES: FrozenSet[str] = frozenset()
+# Most directories are small, so handing them to the pool one at a time spends more on
+# futures and thread hand-offs than on scanning; workers take up to this many at once.
+DIR_BATCH_SIZE = 16
+# A special directory is sized this many directories at a time; what is left is handed back
+# and split across the pool, so one huge node_modules does not keep a single worker busy
+SPECIAL_DIR_BATCH_SIZE = 64
+
+# (dirs_to_visit, special_dirs, files, file_count, size) found in a single directory
+# Files are reported as (size, directory prefix, name, category) and only joined into a full
+# path if they make it into a top-N heap
+FileFound = Tuple[int, str, str, int]
+DirScan = Tuple[List[str], List[Tuple[str, int]], List[FileFound], int, int]
+
 
 def categorize_extension(extension: str) -> str:
     """Extension should include the dot, e.g. '.py'"""
@@ -23,10 +53,14 @@ def categorize_extension(extension: str) -> str:
 
 
 def push_top_n(heap: List[Tuple[int, str]], item: Tuple[int, str], n: int) -> None:
-    """Maintain a min-heap of size n with the largest items."""
+    """
+    Maintain a min-heap of size n with the largest items.
+    Whole tuples are compared so equal sizes are kept by path, whatever order
+    worker threads report them in.
+    """
     if len(heap) < n:
         heapq.heappush(heap, item)
-    elif item[0] > heap[0][0]:
+    elif item > heap[0]:
         heapq.heapreplace(heap, item)
 
 
@@ -51,141 +85,350 @@ def identify_special_dir_name(dirname: str) -> Optional[str]:
     return None
 
 
+def can_track_path(root_path: str, dirpath: str) -> bool:
+    """
+    Check whether a scan of root_path can measure dirpath (a directory inside it) through
+    track_paths: no directory on the way down may be skipped or sized as a special directory,
+    as the scanner never lists what is inside those.
+    """
+    parts = Path(dirpath).relative_to(root_path).parts
+    current_path = root_path
+    for i, name in enumerate(parts):
+        current_path = os.path.join(current_path, name)
+        if is_skip_path(current_path):
+            return False
+        # A special directory is sized as a whole, which still counts if it is dirpath itself
+        if i < len(parts) - 1 and identify_special_dir_name(name) is not None:
+            return False
+    return True
+
+
+@contextmanager
+def scandir_at(dirpath: str) -> Iterator[Iterator["os.DirEntry[str]"]]:
+    """
+    Like os.scandir, but iterates an open directory fd where the platform supports it.
+    Entries then only carry their name in entry.path, so callers join paths themselves.
+    """
+    if not SCANDIR_ACCEPTS_FD:
+        with os.scandir(dirpath) as it:
+            yield it
+        return
+
+    fd = os.open(dirpath, DIR_OPEN_FLAGS)
+    try:
+        with os.scandir(fd) as it:
+            yield it
+    finally:
+        os.close(fd)
+
+
 def calculate_dir_size(dirpath: str) -> int:
     """
     Calculate total size of directory using os.scandir iteratively.
     """
+    return size_dir_tree([dirpath])[0]
+
+
+def size_dir_tree(stack: List[str], max_dirs: int = -1) -> Tuple[int, List[str]]:
+    """
+    Sum the sizes of files below the directories in stack (which is consumed).
+    With max_dirs, stops after visiting that many directories and also returns
+    the directories still to visit, so the walk can be resumed or split.
+    """
     total_size = 0
-    stack = [dirpath]
+    visit_dir = stack.append
 
-    while stack:
+    while stack and max_dirs != 0:
+        max_dirs -= 1
         current_path = stack.pop()
+        prefix = os.path.join(current_path, "")
+        # FileNotFoundError and PermissionError are OSErrors too
         try:
-            with os.scandir(current_path) as it:
+            with scandir_at(current_path) as it:
                 for entry in it:
                     try:
                         if entry.is_file(follow_symlinks=False):
                             stat = entry.stat(follow_symlinks=False)
-                            # st_blocks is 512-byte blocks. reliable on unix.
-                            # fallback to st_size if not available (e.g. windows sometimes)
-                            total_size += (
-                                stat.st_blocks * 512 if hasattr(stat, "st_blocks") else stat.st_size
-                            )
+                            total_size += stat.st_blocks * 512 if HAS_ST_BLOCKS else stat.st_size
                         elif entry.is_dir(follow_symlinks=False):
-                            stack.append(entry.path)
-                    except (FileNotFoundError, PermissionError, OSError):
+                            visit_dir(prefix + entry.name)
+                    except OSError:
                         continue
-        except (FileNotFoundError, PermissionError, OSError):
+        except OSError:
             continue
 
-    return total_size
+    return total_size, stack
+
+
+def scan_dir_entries(current_path: str, min_size: int) -> DirScan:
+    """
+    Scan a single directory without descending into it.
+    Runs on worker threads, so it only reads the filesystem and reports what it found.
+    """
+    dirs_to_visit: List[str] = []
+    special_dirs: List[Tuple[str, int]] = []
+    files: List[FileFound] = []
+    scanned_files = 0
+    scanned_size = 0
+
+    # Everything the per-entry loop needs that does not change within a directory is bound
+    # once here, so each entry costs as few attribute and global lookups as possible
+    visit_dir = dirs_to_visit.append
+    add_special_dir = special_dirs.append
+    add_file = files.append
+    special_dir_category = SPECIAL_DIR_CATEGORY_IDS.get
+    extension_category = EXTENSION_CATEGORY_IDS.get
+    # scandir_at entries only carry their name, so child paths are built from this prefix
+    prefix = os.path.join(current_path, "")
+    # Names of skip dirs that can appear directly under this directory (usually none). The
+    # level is the number of path components, so it is not carried along with every path
+    skip_names = SKIP_NAMES_BY_LEVEL.get(prefix.count(os.sep), NO_SKIP_NAMES)
+
+    try:
+        # Use os.scandir which is much faster than os.walk + os.stat
+        # and avoids creating Path objects for every iteration
+        with scandir_at(current_path) as it:
+            for entry in it:
+                try:
+                    # 1. Handle Directories
+                    if entry.is_dir(follow_symlinks=False):
+                        dirname = entry.name
+                        entry_path = prefix + dirname
+
+                        # Check global skip dirs (usually top level system dirs). The name
+                        # filters out nearly everything before the full path is hashed, and
+                        # the full path rules out e.g. /home/run matching /var/run
+                        if dirname in skip_names and is_skip_path(entry_path):
+                            continue
+
+                        # Special directories are sized as atomic units, never descended
+                        # Inlined identify_special_dir_name, returning the category ID
+                        special_type = special_dir_category(dirname.lower())
+                        if special_type is None and dirname.endswith(".app"):
+                            special_type = MACOS_APPS_CATEGORY_ID
+                        if special_type is not None:
+                            add_special_dir((entry_path, special_type))
+                            continue
+
+                        # If normal directory, schedule for visit
+                        visit_dir(entry_path)
+
+                    # 2. Handle Files
+                    elif entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        size = stat.st_blocks * 512 if HAS_ST_BLOCKS else stat.st_size
+
+                        if size >= min_size:
+                            # Inlined categorize_extension; rfind + slice is cheaper than
+                            # os.path.splitext. dot > 0 keeps dotfiles like .bashrc extensionless
+                            name = entry.name
+                            dot = name.rfind(".")
+                            if dot > 0:
+                                # Most extensions are already lowercase; only lower() on a miss
+                                extension = name[dot:]
+                                category = extension_category(extension)
+                                if category is None:
+                                    category = extension_category(
+                                        extension.lower(), OTHERS_CATEGORY_ID
+                                    )
+                            else:
+                                category = OTHERS_CATEGORY_ID
+                            add_file((size, prefix, name, category))
+
+                        scanned_files += 1
+                        scanned_size += size
+
+                except (FileNotFoundError, PermissionError, OSError):
+                    continue
+
+    except (FileNotFoundError, PermissionError, OSError):
+        pass
+
+    return dirs_to_visit, special_dirs, files, scanned_files, scanned_size
+
+
+def scan_dir_batch(
+    batch: List[str], min_size: int, tracked: Tuple[str, ...] = ()
+) -> Tuple[DirScan, List[int]]:
+    """
+    Run scan_dir_entries over several directories and combine what they found.
+    Also returns, for each prefix in tracked (paths ending in a separator), the bytes found
+    in directories of the batch that lie inside that subtree.
+    """
+    tracked_sizes = [0] * len(tracked)
+    dirs_to_visit: List[str] = []
+    special_dirs: List[Tuple[str, int]] = []
+    files: List[FileFound] = []
+    scanned_files = 0
+    scanned_size = 0
+
+    for current_path in batch:
+        dir_scan = scan_dir_entries(current_path, min_size)
+        dirs_to_visit += dir_scan[0]
+        special_dirs += dir_scan[1]
+        files += dir_scan[2]
+        scanned_files += dir_scan[3]
+        scanned_size += dir_scan[4]
+
+        if tracked:
+            dir_prefix = os.path.join(current_path, "")
+            for i, prefix in enumerate(tracked):
+                if dir_prefix.startswith(prefix):
+                    tracked_sizes[i] += dir_scan[4]
+
+    return (dirs_to_visit, special_dirs, files, scanned_files, scanned_size), tracked_sizes
 
 
 def scan_files_and_dirs(
     root_path: Path,
-    used_bytes: float,
     min_size: int = MIN_FILE_SIZE,
     top_n: int = DEFAULT_TOP_N,
-    show_progress: bool = True,
+    workers: int = DEFAULT_WORKERS,
+    track_paths: Optional[Dict[str, int]] = None,
+    progress: Optional[Callable[[int], object]] = None,
 ) -> Tuple[Dict[str, List[Tuple[int, str]]], Dict[str, List[Tuple[int, str]]], int, int]:
     """
-    Scan directory tree for files and special directories using an iterative stack with os.scandir.
-    Uses min-heaps to keep only top_n largest items per category, reducing memory from O(files) to O(categories * top_n).
+    Scan directory tree for files and special directories with a pool of worker threads.
+    Workers run scan_dir_entries (and calculate_dir_size for special directories) while this
+    thread keeps the stack of directories to visit and merges results. CPython releases the
+    GIL around scandir/stat, so one slow cold-cache directory no longer stalls the traversal.
+    Uses min-heaps to keep only top_n largest items per category, reducing memory from
+    O(files) to O(categories * top_n).
+    If track_paths is given, each of its keys (an absolute directory path) is set to the total
+    size found inside that subtree, so e.g. the Trash can be measured in the same traversal.
+    Only keys for which can_track_path holds are measured in full.
+    If progress is given, it is called with the bytes scanned since its previous call.
     Returns: (file_categories, dir_categories, total_files, total_size)
     """
-    file_heaps: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
-    dir_heaps: Dict[str, List[Tuple[int, str]]] = defaultdict(list)
+    # Heaps indexed by category ID (see config.FILE_CATEGORY_NAMES / DIR_CATEGORY_NAMES)
+    file_heaps: List[List[Tuple[int, str]]] = [[] for _ in FILE_CATEGORY_NAMES]
+    dir_heaps: List[List[Tuple[int, str]]] = [[] for _ in DIR_CATEGORY_NAMES]
     scanned_files = 0
     scanned_size = 0
     progress_update_buffer = 0
 
-    # Stack for iterative traversal: (path_string, level)
-    start_level = len(root_path.parts)
-    stack = [(str(root_path), start_level)]
-
-    # Pre-compute root level usage to skip logic if needed
-    # We'll just check absolute paths for SKIP_DIRS
-
-    with tqdm(
-        total=used_bytes, unit="B", unit_scale=True, desc="Scanning", disable=not show_progress
-    ) as pbar:
-        while stack:
-            current_path, level = stack.pop()
-
-            try:
-                # Use os.scandir which is much faster than os.walk + os.stat
-                # and avoids creating Path objects for every iteration
-                with os.scandir(current_path) as it:
-                    dirs_to_visit = []
-
-                    for entry in it:
-                        try:
-                            # 1. Handle Directories
-                            if entry.is_dir(follow_symlinks=False):
-                                dirname = entry.name
-                                entry_path = entry.path
-
-                                # Check global skip dirs (usually top level system dirs)
-                                # Only check if we are shallow enough to be a skip dir
-                                if level <= DEEPEST_SKIP_LEVEL and is_skip_path(entry_path):
-                                    continue
-
-                                # Check special directories
-                                special_type = identify_special_dir_name(dirname)
-                                if special_type:
-                                    # Calculate size as atomic unit
-                                    dir_size = calculate_dir_size(entry_path)
-
-                                    if dir_size >= min_size:
-                                        push_top_n(
-                                            dir_heaps[special_type], (dir_size, entry_path), top_n
-                                        )
-
-                                    scanned_size += dir_size
-                                    progress_update_buffer += dir_size
-                                    continue  # Do not descend into special dirs
-
-                                # If normal directory, schedule for visit
-                                dirs_to_visit.append((entry_path, level + 1))
-
-                            # 2. Handle Files
-                            elif entry.is_file(follow_symlinks=False):
-                                stat = entry.stat(follow_symlinks=False)
-                                size = (
-                                    stat.st_blocks * 512
-                                    if hasattr(stat, "st_blocks")
-                                    else stat.st_size
-                                )
-
-                                if size >= min_size:
-                                    _, ext = os.path.splitext(entry.name)
-                                    category = categorize_extension(ext)
-                                    push_top_n(file_heaps[category], (size, entry.path), top_n)
-
-                                scanned_files += 1
-                                scanned_size += size
-                                progress_update_buffer += size
-
-                        except (FileNotFoundError, PermissionError, OSError):
-                            continue
+    if track_paths is None:
+        track_paths = {}
+    tracked_keys = list(track_paths)
+    tracked = tuple(os.path.join(key, "") for key in tracked_keys)
+    track_paths.update(dict.fromkeys(tracked_keys, 0))
+
+    # Stack of directory paths for iterative traversal
+    stack = [str(root_path)]
+
+    # Only a bounded number of batches are handed to the pool at a time; the rest wait on the
+    # stack, which keeps the traversal depth-first and memory as low as a serial scan. Batches
+    # shrink while the stack is short so the first levels still spread across all workers.
+    max_in_flight = workers * 2
+    in_flight = 0
+    completed: "queue.SimpleQueue[Future]" = queue.SimpleQueue()
+    # Special directories being sized: future -> (path, category ID), plus per path the size
+    # found so far and the number of size_dir_tree tasks still running for it
+    special_dirs: Dict[Future, Tuple[str, int]] = {}
+    special_sizes: Dict[str, int] = {}
+    special_pending: Dict[str, int] = {}
+    executor = ThreadPoolExecutor(max_workers=workers)
+
+    def submit(fn: Callable, *args: object) -> Future:
+        nonlocal in_flight
+        future = executor.submit(fn, *args)
+        future.add_done_callback(completed.put)
+        in_flight += 1
+        return future
+
+    def submit_sizing(entry_path: str, special_type: int, stack: List[str]) -> None:
+        special_pending[entry_path] += 1
+        future = submit(size_dir_tree, stack, SPECIAL_DIR_BATCH_SIZE)
+        special_dirs[future] = (entry_path, special_type)
+
+    try:
+        while stack or in_flight:
+            while stack and in_flight < max_in_flight:
+                batch_size = max(1, min(DIR_BATCH_SIZE, len(stack) // workers))
+                batch = stack[-batch_size:]
+                del stack[-batch_size:]
+                submit(scan_dir_batch, batch, min_size, tracked)
+
+            future = completed.get()
+            in_flight -= 1
+
+            if future in special_dirs:
+                entry_path, special_type = special_dirs.pop(future)
+                dir_size, unvisited = future.result()
+                special_sizes[entry_path] += dir_size
+                special_pending[entry_path] -= 1
+
+                # Split what is left of a large directory in two, so it fans out over the pool
+                half = len(unvisited) // 2
+                if half:
+                    submit_sizing(entry_path, special_type, unvisited[:half])
+                    submit_sizing(entry_path, special_type, unvisited[half:])
+                elif unvisited:
+                    submit_sizing(entry_path, special_type, unvisited)
+
+                if not special_pending[entry_path]:
+                    del special_pending[entry_path]
+                    total = special_sizes.pop(entry_path)
+                    if total >= min_size:
+                        push_top_n(dir_heaps[special_type], (total, entry_path), top_n)
+
+                scanned_size += dir_size
+                progress_update_buffer += dir_size
+
+                if tracked:
+                    dir_prefix = os.path.join(entry_path, "")
+                    for key, prefix in zip(tracked_keys, tracked):
+                        if dir_prefix.startswith(prefix):
+                            track_paths[key] += dir_size
+                continue
 
-                    for d in dirs_to_visit:
-                        stack.append(d)
+            dir_scan, tracked_sizes = future.result()
+            dirs_to_visit, found_special_dirs, files, dir_files, dir_size = dir_scan
 
-                    # Update progress bar
-                    if progress_update_buffer >= PROGRESS_UPDATE_THRESHOLD:
-                        pbar.update(progress_update_buffer)
-                        progress_update_buffer = 0
+            for key, tracked_size in zip(tracked_keys, tracked_sizes):
+                track_paths[key] += tracked_size
 
-            except (FileNotFoundError, PermissionError, OSError):
-                continue
+            for size, prefix, name, category in files:
+                heap = file_heaps[category]
+                # Equal sizes are ordered by path, so they still need the full path
+                if len(heap) < top_n or size >= heap[0][0]:
+                    push_top_n(heap, (size, prefix + name), top_n)
+
+            scanned_files += dir_files
+            scanned_size += dir_size
+            progress_update_buffer += dir_size
+
+            # Calculate size of special dirs as atomic units on the pool as well, so a deep
+            # node_modules does not serialize the rest of the traversal
+            for entry_path, special_type in found_special_dirs:
+                special_sizes[entry_path] = 0
+                special_pending[entry_path] = 0
+                submit_sizing(entry_path, special_type, [entry_path])
+
+            stack.extend(dirs_to_visit)
+
+            # Report progress
+            if progress is not None and progress_update_buffer >= PROGRESS_UPDATE_THRESHOLD:
+                progress(progress_update_buffer)
+                progress_update_buffer = 0
 
         # Final progress update
-        if progress_update_buffer > 0:
-            pbar.update(progress_update_buffer)
+        if progress is not None and progress_update_buffer > 0:
+            progress(progress_update_buffer)
+    finally:
+        # On Ctrl-C, drop queued work instead of draining it
+        executor.shutdown(cancel_futures=True)
 
     # Convert heaps to sorted lists (descending by size)
-    file_categories = {cat: sorted(heap, reverse=True) for cat, heap in file_heaps.items()}
-    dir_categories = {cat: sorted(heap, reverse=True) for cat, heap in dir_heaps.items()}
+    file_categories = {
+        FILE_CATEGORY_NAMES[cat]: sorted(heap, reverse=True)
+        for cat, heap in enumerate(file_heaps)
+        if heap
+    }
+    dir_categories = {
+        DIR_CATEGORY_NAMES[cat]: sorted(heap, reverse=True)
+        for cat, heap in enumerate(dir_heaps)
+        if heap
+    }
 
     return file_categories, dir_categories, scanned_files, scanned_size
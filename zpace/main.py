@@ -3,63 +3,85 @@ import importlib.metadata
 import os
 import shutil
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import sys
+import threading
+from concurrent.futures import Future
+
+from tqdm import tqdm
 
 from zpace.config import (
     MIN_FILE_SIZE,
     DEFAULT_TOP_N,
+    DEFAULT_WORKERS,
+    OUTPUT_BUFFER_SIZE,
+    PROGRESS_MIN_INTERVAL,
 )
-from zpace.utils import get_disk_usage, format_size, get_trash_path
-from zpace.core import (
-    calculate_dir_size,
-    scan_files_and_dirs,
-)
+from zpace.utils import get_cached_trash_size, get_disk_usage, format_size, get_trash_path
+from zpace.core import can_track_path, scan_files_and_dirs
 from zpace.output import build_scan_result
 
 
-def print_results(
+def run_in_background(fn: Callable[..., int], *args: object) -> "Future[int]":
+    """
+    Run fn on a daemon thread and return a Future for its result. Unlike executor workers,
+    a daemon thread does not hold up interpreter exit, so Ctrl-C or an error still quits at once.
+    """
+    future: "Future[int]" = Future()
+
+    def run() -> None:
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, daemon=True).start()
+    return future
+
+
+def format_results(
     file_categories: Dict[str, List[Tuple[int, str]]],
     dir_categories: Dict[str, List[Tuple[int, str]]],
     terminal_width: int,
-):
-    """Print both file and directory results."""
-
-    # Print special directories first
-    if dir_categories:
-        print(f"\n{'=' * terminal_width}")
-        print("SPECIAL DIRECTORIES")
-        print("=" * terminal_width)
-
-        for category in sorted(dir_categories.keys()):
-            entries = dir_categories[category]
+) -> List[str]:
+    """Lay out both file and directory results as lines of text."""
+    lines: List[str] = []
+    add = lines.append
+
+    # Special directories first
+    for title, categories, noun in (
+        ("SPECIAL DIRECTORIES", dir_categories, "directories"),
+        ("LARGEST FILES BY CATEGORY", file_categories, "files"),
+    ):
+        if not categories:
+            continue
+
+        lines += ["", "=" * terminal_width, title, "=" * terminal_width]
+
+        for category in sorted(categories.keys()):
+            entries = categories[category]
             if not entries:
                 continue
 
-            print(f"\n{'-' * terminal_width}")
-            print(f"{category} ({len(entries)} directories)")
-            print("-" * terminal_width)
-
-            for size, dirpath in entries:
-                print(f"  {format_size(size):>12}  {dirpath}")
+            lines += ["", "-" * terminal_width, f"{category} ({len(entries)} {noun})"]
+            add("-" * terminal_width)
 
-    # Print file categories
-    if file_categories:
-        print(f"\n{'=' * terminal_width}")
-        print("LARGEST FILES BY CATEGORY")
-        print("=" * terminal_width)
+            for size, path in entries:
+                add(f"  {format_size(size):>12}  {path}")
 
-        for category in sorted(file_categories.keys()):
-            entries = file_categories[category]
-            if not entries:
-                continue
+    return lines
 
-            print(f"\n{'-' * terminal_width}")
-            print(f"{category} ({len(entries)} files)")
-            print("-" * terminal_width)
 
-            for size, filepath in entries:
-                print(f"  {format_size(size):>12}  {filepath}")
+def print_results(
+    file_categories: Dict[str, List[Tuple[int, str]]],
+    dir_categories: Dict[str, List[Tuple[int, str]]],
+    terminal_width: int,
+):
+    """Print both file and directory results."""
+    lines = format_results(file_categories, dir_categories, terminal_width)
+    # One write for the whole table instead of a print (and a flush to a terminal) per line
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
@@ -98,6 +120,13 @@ def main():
         default=MIN_FILE_SIZE // 1024,
         help=f"Minimum file/dir size in KB (default: {MIN_FILE_SIZE // 1024})",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of threads scanning directories in parallel (default: {DEFAULT_WORKERS})",
+    )
     parser.add_argument(
         "-o",
         "--output",
@@ -112,6 +141,8 @@ def main():
     )
 
     args = parser.parse_args()
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
     # Do not resolve yet, check if it's a symlink first
     raw_path = Path(args.path).expanduser()
 
@@ -140,37 +171,41 @@ def main():
             print(f"  Used:  {format_size(used)} ({used / total * 100:.1f}%)")
         else:
             print("  (disk usage unavailable on this platform)")
+        print("=" * terminal_width)
 
-    # Check Trash size
+    # Check Trash size. When the Trash lies inside scan_path the scan can measure it on the way
+    # (track_paths); otherwise it is measured (or read from the cache of an earlier run) on its
+    # own thread while the scan runs. Shown with the scan summary either way.
     trash_size = None
+    trash_status = None  # shown instead of a size when the Trash can't be measured
+    track_paths: Optional[Dict[str, int]] = None
+    measure_trash = False
     trash_path = get_trash_path()
     if trash_path:
-        if os.path.exists(trash_path):
-            if os.access(trash_path, os.R_OK):
-                try:
-                    # Verify we can actually list it (os.access might lie on some systems/containers)
-                    next(os.scandir(trash_path), None)
-                    trash_size = calculate_dir_size(trash_path)
-                    if not quiet_mode:
-                        additional_message = ""
-                        if trash_size > 1000 * 1024 * 1024:  # 1000 MB
-                            additional_message = " (Consider cleaning up your trash bin!)"
-                        print(f"  Trash: {format_size(trash_size)}{additional_message}")
-                except PermissionError:
-                    if not quiet_mode:
-                        print("  Trash: Access Denied")
-            else:
-                if not quiet_mode:
-                    print("  Trash: Access Denied")
+        # Listing the Trash checks that it exists and is readable in a single call, where
+        # os.access might lie on some systems/containers. Closed right away, rather than
+        # leaving the fd to the garbage collector
+        try:
+            with os.scandir(trash_path) as it:
+                next(it, None)
+        except (FileNotFoundError, NotADirectoryError):
+            trash_status = "Not Found"
+        except OSError:
+            trash_status = "Access Denied"
         else:
-            if not quiet_mode:
-                print("  Trash: Not Found")
+            trash_path = os.path.realpath(trash_path)
+            # A Trash below a skipped or special directory (e.g. /private/var/root/.Trash when
+            # scanning /) is never listed by the scan, so it is measured on its own instead
+            if Path(trash_path).is_relative_to(scan_path) and can_track_path(
+                str(scan_path), trash_path
+            ):
+                track_paths = {trash_path: 0}
+            else:
+                measure_trash = True
     else:
-        if not quiet_mode:
-            print("  Trash: Unknown OS")
+        trash_status = "Unknown OS"
 
     if not quiet_mode:
-        print("=" * terminal_width)
         print(f"\nSCANNING: {scan_path}")
         print(f"   Min size: {args.min_size} KB")
         print()
@@ -189,10 +224,31 @@ def main():
             print(msg)
         return
 
+    trash_future: Optional["Future[int]"] = None
+    if measure_trash:
+        trash_future = run_in_background(get_cached_trash_size, trash_path)
+
     try:
-        top_files, top_dirs, total_files, total_size = scan_files_and_dirs(
-            scan_path, used, args.min_size * 1024, top_n=args.top, show_progress=not quiet_mode
-        )
+        with tqdm(
+            # The filesystem's used bytes only bound the scan of a whole filesystem; a
+            # subdirectory gets an indeterminate progress bar instead of a misleading one
+            total=used if os.path.ismount(scan_path) else None,
+            unit="B",
+            unit_scale=True,
+            desc="Scanning",
+            # None disables the bar when stderr is not a terminal (pipes, CI, cron)
+            disable=True if quiet_mode else None,
+            # A scan runs for seconds to minutes; redrawing 4 times a second is plenty
+            mininterval=PROGRESS_MIN_INTERVAL,
+        ) as pbar:
+            top_files, top_dirs, total_files, total_size = scan_files_and_dirs(
+                scan_path,
+                args.min_size * 1024,
+                top_n=args.top,
+                workers=args.jobs,
+                track_paths=track_paths,
+                progress=pbar.update,
+            )
     except KeyboardInterrupt:
         print("\nScan interrupted by user")
         sys.exit(1)
@@ -200,6 +256,11 @@ def main():
         print(f"Error during scan: {e}")
         sys.exit(1)
 
+    if track_paths is not None:
+        trash_size = track_paths[trash_path]
+    elif trash_future is not None:
+        trash_size = trash_future.result()
+
     # JSON output mode
     if args.json:
         result = build_scan_result(
@@ -213,68 +274,39 @@ def main():
             total_files=total_files,
             total_size=total_size,
         )
-        json_output = result.to_json()
         if args.output:
-            with open(args.output, "w") as f:
-                f.write(json_output)
-                f.write("\n")
+            with open(args.output, "w", buffering=OUTPUT_BUFFER_SIZE) as f:
+                result.write_json(f)
         else:
-            print(json_output)
+            result.write_json(sys.stdout)
         return
 
     # Text file output mode (no colors, no progress - already handled)
     if args.output:
-        import io
-
-        buffer = io.StringIO()
-        buffer.write("DISK USAGE\n")
-        buffer.write("=" * 80 + "\n")
-        buffer.write(f"  Free:  {format_size(free)} / {format_size(total)}\n")
-        buffer.write(f"  Used:  {format_size(used)} ({used / total * 100:.1f}%)\n")
+        lines = [
+            "DISK USAGE",
+            "=" * 80,
+            f"  Free:  {format_size(free)} / {format_size(total)}",
+            f"  Used:  {format_size(used)} ({used / total * 100:.1f}%)",
+        ]
         if trash_size is not None:
-            buffer.write(f"  Trash: {format_size(trash_size)}\n")
-        buffer.write("=" * 80 + "\n\n")
-        buffer.write(f"SCAN PATH: {scan_path}\n")
-        buffer.write(f"Min size: {args.min_size} KB\n\n")
-        buffer.write("SCAN COMPLETE!\n")
-        buffer.write(f"   Found {total_files:,} files\n")
-        buffer.write(f"   Found {sum(len(e) for e in top_dirs.values())} special directories\n")
-        buffer.write(f"   Total size: {format_size(total_size)}\n")
-
-        # Write special directories
-        if top_dirs:
-            buffer.write("\n" + "=" * 80 + "\n")
-            buffer.write("SPECIAL DIRECTORIES\n")
-            buffer.write("=" * 80 + "\n")
-            for category in sorted(top_dirs.keys()):
-                entries = top_dirs[category]
-                if not entries:
-                    continue
-                buffer.write("\n" + "-" * 80 + "\n")
-                buffer.write(f"{category} ({len(entries)} directories)\n")
-                buffer.write("-" * 80 + "\n")
-                for size, dirpath in entries:
-                    buffer.write(f"  {format_size(size):>12}  {dirpath}\n")
-
-        # Write file categories
-        if top_files:
-            buffer.write("\n" + "=" * 80 + "\n")
-            buffer.write("LARGEST FILES BY CATEGORY\n")
-            buffer.write("=" * 80 + "\n")
-            for category in sorted(top_files.keys()):
-                entries = top_files[category]
-                if not entries:
-                    continue
-                buffer.write("\n" + "-" * 80 + "\n")
-                buffer.write(f"{category} ({len(entries)} files)\n")
-                buffer.write("-" * 80 + "\n")
-                for size, filepath in entries:
-                    buffer.write(f"  {format_size(size):>12}  {filepath}\n")
-
-        buffer.write("=" * 80 + "\n")
+            lines.append(f"  Trash: {format_size(trash_size)}")
+        lines += [
+            "=" * 80,
+            "",
+            f"SCAN PATH: {scan_path}",
+            f"Min size: {args.min_size} KB",
+            "",
+            "SCAN COMPLETE!",
+            f"   Found {total_files:,} files",
+            f"   Found {sum(len(e) for e in top_dirs.values())} special directories",
+            f"   Total size: {format_size(total_size)}",
+        ]
+        lines += format_results(top_files, top_dirs, 80)
+        lines.append("=" * 80)
 
         with open(args.output, "w") as f:
-            f.write(buffer.getvalue())
+            f.write("\n".join(lines) + "\n")
         return
 
     # Display results (normal interactive mode)
@@ -282,6 +314,13 @@ def main():
     print(f"   Found {total_files:,} files")
     print(f"   Found {sum(len(e) for e in top_dirs.values())} special directories")
     print(f"   Total size: {format_size(total_size)}")
+    if trash_size is not None:
+        additional_message = ""
+        if trash_size > 1000 * 1024 * 1024:  # 1000 MB
+            additional_message = " (Consider cleaning up your trash bin!)"
+        print(f"   Trash: {format_size(trash_size)}{additional_message}")
+    else:
+        print(f"   Trash: {trash_status}")
 
     print_results(top_files, top_dirs, terminal_width)
     print("=" * terminal_width)
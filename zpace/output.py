@@ -1,7 +1,7 @@
 import json
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import IO, Any, Dict, List, Optional
 
 
 @dataclass
@@ -13,14 +13,20 @@ class DiskUsage:
     trash_bytes: Optional[int] = None
 
 
+# dataclass(slots=True) needs Python 3.10, so the slots are declared by hand. That only
+# works for classes whose fields have no defaults (defaults live on the class).
 @dataclass
 class FileEntry:
+    __slots__ = ("path", "size_bytes")
+
     path: str
     size_bytes: int
 
 
 @dataclass
 class ScanSummary:
+    __slots__ = ("total_files", "special_directories_count", "total_size_bytes")
+
     total_files: int
     special_directories_count: int
     total_size_bytes: int
@@ -61,6 +67,7 @@ class ScanResult:
                 "total_size_bytes": self.scan_summary.total_size_bytes,
             }
 
+        # Results from build_scan_result are already sorted, which sorted() checks in one pass
         result["special_directories"] = {
             category: [{"path": e.path, "size_bytes": e.size_bytes} for e in entries]
             for category, entries in sorted(self.special_directories.items())
@@ -77,6 +84,13 @@ class ScanResult:
         """Serialize to JSON string."""
         return json.dumps(self.to_dict(), indent=indent)
 
+    def write_json(self, fp: IO[str], indent: int = 2) -> None:
+        """Serialize as JSON to a text file, followed by a newline."""
+        # json.dump hands the encoder's chunks straight to fp, so the whole document is never
+        # held as one string
+        json.dump(self.to_dict(), fp, indent=indent)
+        fp.write("\n")
+
 
 def build_scan_result(
     scan_path: str,
@@ -109,15 +123,17 @@ def build_scan_result(
         total_size_bytes=total_size,
     )
 
-    # Convert tuples to FileEntry objects
+    # Convert tuples to FileEntry objects, with categories already in output order
     special_directories = {
-        category: [FileEntry(path=path, size_bytes=size) for size, path in entries]
-        for category, entries in dir_categories.items()
+        category: [FileEntry(path=path, size_bytes=size) for size, path in dir_categories[category]]
+        for category in sorted(dir_categories)
     }
 
     files_by_category = {
-        category: [FileEntry(path=path, size_bytes=size) for size, path in entries]
-        for category, entries in file_categories.items()
+        category: [
+            FileEntry(path=path, size_bytes=size) for size, path in file_categories[category]
+        ]
+        for category in sorted(file_categories)
     }
 
     return ScanResult(
@@ -1,8 +1,17 @@
+import functools
+import json
 import os
 import shutil
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
+
+from zpace.core import calculate_dir_size
+
+# Where the last measured Trash size is kept between runs
+TRASH_CACHE_FILE = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "zpace" / "trash.json"
+)
 
 
 def get_disk_usage(path: str):
@@ -13,14 +22,18 @@ def get_disk_usage(path: str):
         return 0, 0, 0
 
 
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
+
+@functools.lru_cache(maxsize=1024)
 def format_size(size: float) -> str:
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if size < 1024:
-            return f"{size:.2f} {unit}"
-        size /= 1024
-    return f"{size:.2f} PB"
+    # Every 10 bits of the integer part is one factor of 1024, so the unit comes straight
+    # from the bit length instead of dividing in a loop
+    unit = min(max(int(size).bit_length() - 1, 0) // 10, len(SIZE_UNITS) - 1)
+    return f"{size / (1 << (10 * unit)):.2f} {SIZE_UNITS[unit]}"
 
 
+@functools.lru_cache(maxsize=1)
 def get_trash_path() -> Optional[str]:
     """Get the path to the Trash/Recycle Bin based on the OS."""
     if sys.platform == "darwin":
@@ -31,3 +44,45 @@ def get_trash_path() -> Optional[str]:
         system_drive = os.environ.get("SystemDrive", "C:")
         return str(Path(system_drive) / "$Recycle.Bin")
     return None
+
+
+def _trash_mtimes(trash_path: str) -> List[int]:
+    """
+    Modification times of the Trash and of the directories directly inside it.
+    Trashing or emptying adds or removes entries at one of these levels (Trash/files and
+    Trash/info on Linux, the Trash itself on macOS, per-user folders on Windows).
+    """
+    mtimes = [os.stat(trash_path).st_mtime_ns]
+    with os.scandir(trash_path) as it:
+        for entry in sorted(it, key=lambda entry: entry.name):
+            if entry.is_dir(follow_symlinks=False):
+                mtimes.append(entry.stat(follow_symlinks=False).st_mtime_ns)
+    return mtimes
+
+
+def get_cached_trash_size(trash_path: str) -> int:
+    """
+    Size of the Trash, reusing the size cached by a previous run while the Trash's
+    directories are unchanged, and walking it (then updating the cache) otherwise.
+    """
+    try:
+        mtimes = _trash_mtimes(trash_path)
+    except OSError:
+        return calculate_dir_size(trash_path)
+
+    try:
+        cached = json.loads(TRASH_CACHE_FILE.read_text())
+        if cached["path"] == trash_path and cached["mtimes"] == mtimes:
+            return int(cached["size"])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    size = calculate_dir_size(trash_path)
+    try:
+        TRASH_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        TRASH_CACHE_FILE.write_text(
+            json.dumps({"path": trash_path, "mtimes": mtimes, "size": size})
+        )
+    except OSError:
+        pass  # Caching is best effort, e.g. on a read-only home
+    return size